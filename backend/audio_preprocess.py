@@ -0,0 +1,230 @@
+import bisect
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+from backend.audio_utils import FFMPEG, _run, probe_duration
+from backend.instrumentation import incr, set_attribute
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Audio pre-processing ahead of transcription
+# - Recordings are decoded to mono 16 kHz PCM (Whisper's own input format) through an ffmpeg pipe, long silent stretches
+#   are cut with an energy-based voice activity detector, and the rest is re-encoded as low-bitrate mono mp3
+# - Smaller uploads and less audio for Whisper to process: an hour of speech is ~14 MB at 32 kbps, so most meetings
+#   fit in one request instead of being split
+# - Cutting silence shifts the timestamps Whisper returns. The timestamp map kept here converts them back to seconds of
+#   the original recording (see to_original() / remap_segments())
+# - Decoding and encoding are streamed, memory does not grow with the recording length
+# - AUDIO_PREPROCESS=0 turns the stage off. It is also skipped (original file uploaded) when ffmpeg is missing
+# ─────────────────────────────────────────────────────────────────────────────
+
+ENABLED = os.getenv("AUDIO_PREPROCESS", "1") != "0"
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03    #VAD frame length
+BITRATE = os.getenv("AUDIO_PREPROCESS_BITRATE", "32k")
+MIN_SILENCE = float(os.getenv("AUDIO_PREPROCESS_MIN_SILENCE", "1.0"))  #Only silences at least this long are cut
+PADDING = 0.25  #Seconds of silence kept on each side of speech, so word onsets and endings are not clipped
+_CHUNK_BYTES = 1 << 20
+
+logger = logging.getLogger("briefly.audio")
+
+
+def _decoder(file_path):
+    return subprocess.Popen([FFMPEG, "-hide_banner", "-loglevel", "error", "-i", file_path, "-vn", "-ac", "1",
+                             "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+# --- Decoded PCM as int16 arrays of about _CHUNK_BYTES, straight from the ffmpeg pipe ---
+def _pcm_chunks(file_path):
+    try:
+        process = _decoder(file_path)
+    except FileNotFoundError:
+        raise RuntimeError(f"{FFMPEG} was not found. Install ffmpeg to split or convert audio.")
+    leftover, finished = b"", False
+    try:
+        for data in iter(lambda: process.stdout.read(_CHUNK_BYTES), b""):
+            data = leftover + data
+            usable = len(data) - len(data) % 2     #Keep whole 16-bit samples
+            leftover = data[usable:]
+            yield np.frombuffer(data[:usable], dtype=np.int16)
+        finished = True
+    finally:
+        if not finished:    #Closed early (GeneratorExit) or the consumer failed: stop ffmpeg, nothing to report
+            process.terminate()
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors="replace")
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise RuntimeError(f"{FFMPEG} failed: {stderr.strip()[-500:]}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# frame_energies()
+# Purpose: Loudness of every FRAME_SECONDS frame of the recording, in dBFS
+# Returns:
+#   - np.ndarray: One value per frame (-100 for digital silence)
+# ─────────────────────────────────────────────────────────────────────────────
+def frame_energies(file_path):
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    energies, pending = [], np.zeros(0, dtype=np.int16)
+    for chunk in _pcm_chunks(file_path):
+        samples = np.concatenate([pending, chunk])
+        whole = len(samples) - len(samples) % frame
+        frames = samples[:whole].astype(np.float32).reshape(-1, frame) / 32768.0
+        energies.append(10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10))
+        pending = samples[whole:]
+    if len(pending):
+        energies.append(10 * np.log10(np.array([np.mean((pending.astype(np.float32) / 32768.0) ** 2)]) + 1e-10))
+    return np.concatenate(energies) if energies else np.zeros(0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# speech_intervals()
+# Purpose: Energy-based voice activity detection
+# - The noise floor is the 10th percentile of the frame loudness. A frame is speech when it is margin_db above it
+#   (and above -55 dBFS, so a recording of pure room tone is not all "speech")
+# - Speech regions are padded by PADDING and gaps shorter than min_silence are kept, so only long pauses are cut
+# Parameters:
+#   - energies (np.ndarray): frame_energies() output
+#   - margin_db (float): How far above the noise floor speech must be
+#   - min_silence (float): Shortest silence, in seconds, that is removed
+# Returns:
+#   - list[tuple[float, float]]: (start, end) in seconds of the audio to keep
+# ─────────────────────────────────────────────────────────────────────────────
+def speech_intervals(energies, margin_db=12.0, min_silence=MIN_SILENCE):
+    if len(energies) == 0:
+        return []
+    threshold = max(np.percentile(energies, 10) + margin_db, -55.0)
+    speech = energies > threshold
+    duration = len(energies) * FRAME_SECONDS
+
+    intervals = []
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], speech.astype(np.int8), [0]])))   #Alternating run starts and ends
+    for start, end in zip(edges[::2], edges[1::2]):
+        start = max(start * FRAME_SECONDS - PADDING, 0.0)
+        end = min(end * FRAME_SECONDS + PADDING, duration)
+        if intervals and start - intervals[-1][1] < min_silence:
+            intervals[-1] = (intervals[-1][0], end)     #Short pause: keep it
+        else:
+            intervals.append((start, end))
+    return [(round(s, 3), round(e, 3)) for s, e in intervals]
+
+
+# --- Streams the kept parts of the recording from the decoder into an mp3 encoder ---
+def _encode_intervals(file_path, intervals, out_path, bitrate):
+    encoder = subprocess.Popen([FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-f", "s16le", "-ar", str(SAMPLE_RATE),
+                                "-ac", "1", "-i", "-", "-c:a", "libmp3lame", "-b:a", bitrate, out_path],
+                               stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    bounds = [(int(s * SAMPLE_RATE), int(e * SAMPLE_RATE)) for s, e in intervals]
+    position, index = 0, 0
+    try:
+        for chunk in _pcm_chunks(file_path):
+            chunk_end = position + len(chunk)
+            while index < len(bounds) and bounds[index][0] < chunk_end:
+                start, end = bounds[index]
+                piece = chunk[max(start - position, 0):max(min(end, chunk_end) - position, 0)]
+                encoder.stdin.write(piece.tobytes())
+                if end > chunk_end:
+                    break   #Interval continues in the next chunk
+                index += 1
+            position = chunk_end
+    finally:
+        encoder.stdin.close()
+        stderr = encoder.stderr.read().decode(errors="replace")
+        if encoder.wait() != 0:
+            raise RuntimeError(f"{FFMPEG} failed: {stderr.strip()[-500:]}")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# preprocess_audio()
+# Purpose: Mono 16 kHz low-bitrate copy of a recording with the long silences cut out
+# Parameters:
+#   - file_path (str): Original recording
+#   - out_path (str): Where to write the processed mp3
+#   - trim_silence (bool): Run the voice activity detection (False only re-encodes)
+#   - bitrate (str): mp3 bitrate, e.g. "32k"
+# Returns:
+#   - dict: {"path", "map", "original_bytes", "processed_bytes", "bytes_saved", "original_seconds", "processed_seconds",
+#     "seconds_saved"} where map is [(processed_start, original_start, length), ...] in seconds
+# Raises:
+#   - RuntimeError: if ffmpeg is missing or fails
+# ─────────────────────────────────────────────────────────────────────────────
+def preprocess_audio(file_path, out_path, trim_silence=True, bitrate=BITRATE):
+    original_seconds = probe_duration(file_path)
+    intervals = speech_intervals(frame_energies(file_path)) if trim_silence else [(0.0, original_seconds)]
+    if not intervals:   #Nothing above the noise floor: keep everything rather than sending an empty file
+        intervals = [(0.0, original_seconds)]
+
+    if trim_silence:
+        _encode_intervals(file_path, intervals, out_path, bitrate)
+    else:
+        _run([FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-i", file_path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+              "-c:a", "libmp3lame", "-b:a", bitrate, out_path])
+
+    mapping, processed_start = [], 0.0
+    for start, end in intervals:
+        mapping.append((round(processed_start, 3), start, round(end - start, 3)))
+        processed_start += end - start
+    original_bytes = os.path.getsize(file_path)
+    processed_bytes = os.path.getsize(out_path)
+    report = {
+        "path": out_path,
+        "map": mapping,
+        "original_bytes": original_bytes,
+        "processed_bytes": processed_bytes,
+        "bytes_saved": original_bytes - processed_bytes,
+        "original_seconds": round(original_seconds, 2),
+        "processed_seconds": round(processed_start, 2),
+        "seconds_saved": round(original_seconds - processed_start, 2),
+    }
+    incr("preprocess_bytes_saved_total", report["bytes_saved"])
+    incr("preprocess_seconds_saved_total", report["seconds_saved"])
+    set_attribute(preprocess={k: v for k, v in report.items() if k not in ("path", "map")})
+    return report
+
+
+def to_original(seconds, mapping):
+    """
+    Converts a time in the processed audio to the matching time in the original recording.
+    """
+    if not mapping:
+        return seconds
+    index = max(bisect.bisect_right([piece[0] for piece in mapping], seconds) - 1, 0)
+    processed_start, original_start, length = mapping[index]
+    return round(original_start + min(max(seconds - processed_start, 0.0), length), 2)
+
+
+def remap_segments(segments, mapping):
+    """
+    Returns copies of {"start", "end", "text"} segments with their times moved back onto the original recording.
+    """
+    return [{**seg, "start": to_original(seg["start"], mapping), "end": to_original(seg["end"], mapping)} for seg in segments]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# prepared_audio()
+# Purpose: Context manager handing the transcription code the file to upload
+# Yields:
+#   - (str, dict | None): Path of the processed copy and its preprocess_audio() report, or the original path and None
+#     when the stage is off or ffmpeg is unavailable. The processed copy is deleted when the block ends
+# ─────────────────────────────────────────────────────────────────────────────
+@contextmanager
+def prepared_audio(file_path, enabled=None):
+    if not (ENABLED if enabled is None else enabled) or shutil.which(FFMPEG) is None:
+        yield file_path, None
+        return
+    with tempfile.TemporaryDirectory(prefix="briefly_preprocess_") as tmp_dir:
+        try:
+            report = preprocess_audio(file_path, os.path.join(tmp_dir, "speech.mp3"))
+        except (RuntimeError, OSError) as e:    #Undecodable or unusual input: upload it untouched, Whisper may still read it
+            logger.warning("Audio pre-processing skipped for %s: %s", file_path, e)
+            set_attribute(preprocess={"skipped": str(e)})
+            report = None
+        if report is None or report["processed_bytes"] >= report["original_bytes"]:
+            yield file_path, None   #Already small (e.g. a low-bitrate mono file with no silence)
+        else:
+            yield report["path"], report
@@ -0,0 +1,78 @@
+import os
+import re
+import subprocess
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Audio helpers built on the ffmpeg / ffprobe command line tools
+# - ffmpeg must be installed and on PATH (https://ffmpeg.org/download.html)
+# - Used to split long recordings into segments that fit the Whisper API upload limit
+# ─────────────────────────────────────────────────────────────────────────────
+
+FFMPEG = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFPROBE = os.getenv("FFPROBE_BINARY", "ffprobe")
+
+
+def _run(cmd):
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except FileNotFoundError:
+        raise RuntimeError(f"{cmd[0]} was not found. Install ffmpeg to split or convert audio.")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"{cmd[0]} failed: {e.stderr.strip()[-500:]}")
+
+
+# --- Length of a recording in seconds ---
+def probe_duration(file_path):
+    result = _run([FFPROBE, "-v", "error", "-show_entries", "format=duration", "-of", "default=nw=1:nk=1", file_path])
+    return float(result.stdout.strip())
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# detect_silences()
+# Purpose: Finds silent stretches with ffmpeg's silencedetect filter
+# Parameters:
+#   - file_path (str): Audio file
+#   - noise_db (int): Anything quieter than this level (dBFS) counts as silence
+#   - min_silence (float): Shortest silence, in seconds, worth reporting
+# Returns:
+#   - list[tuple[float, float]]: (start, end) of each silence in seconds
+# ─────────────────────────────────────────────────────────────────────────────
+def detect_silences(file_path, noise_db=-35, min_silence=0.5):
+    result = _run([FFMPEG, "-hide_banner", "-nostats", "-i", file_path,
+                   "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}", "-f", "null", "-"])
+    starts = [float(x) for x in re.findall(r"silence_start: (-?[\d.]+)", result.stderr)]
+    ends = [float(x) for x in re.findall(r"silence_end: ([\d.]+)", result.stderr)]
+    return list(zip(starts, ends))  #A silence running to the end of the file has no silence_end and is dropped
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# plan_segments()
+# Purpose: Splits [0, duration] into segments of about segment_seconds
+# Parameters:
+#   - duration (float): Length of the recording in seconds
+#   - segment_seconds (float): Target segment length
+#   - silences (list): Optional detect_silences() output. Each cut is moved to the middle of the silence closest to it,
+#     within search_seconds, so words are not cut in half
+#   - search_seconds (float): How far a cut may move to reach a silence
+# Returns:
+#   - list[tuple[float, float]]: (start, end) of each segment in seconds
+# ─────────────────────────────────────────────────────────────────────────────
+def plan_segments(duration, segment_seconds=600, silences=None, search_seconds=30):
+    midpoints = [(s + e) / 2 for s, e in (silences or [])]
+    segments, start = [], 0.0
+    while duration - start > segment_seconds:
+        cut = start + segment_seconds
+        nearby = [m for m in midpoints if abs(m - cut) <= search_seconds and m > start + 1]
+        if nearby:
+            cut = min(nearby, key=lambda m: abs(m - cut))
+        segments.append((start, cut))
+        start = cut
+    segments.append((start, duration))
+    return segments
+
+
+# --- Cut one segment out of a recording as mono speech-quality mp3 ---
+def extract_segment(file_path, start, end, out_path, bitrate="64k"):
+    _run([FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-ss", f"{start:.3f}", "-t", f"{end - start:.3f}",
+          "-i", file_path, "-vn", "-ac", "1", "-c:a", "libmp3lame", "-b:a", bitrate, out_path])
+    return out_path
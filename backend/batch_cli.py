@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from backend.text_ingest import TEXT_EXTENSIONS, has_speaker_timeline, is_text_transcript, read_transcript
+from backend.transcript_cache import file_digest
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Headless batch processing
+# - Transcribes, summarizes, scores the mood of and suggests next steps for every recording in a directory or manifest
+# - API-bound stages (Whisper, GPT) share one thread pool of --api-workers, sentiment runs in --sentiment-workers processes.
+#   Each API worker has at most one request in flight: the segments of a long recording are uploaded one after another
+#   here, and the parallelism comes from processing several recordings at once
+# - One JSON line per recording is appended to --out as soon as it finishes. Recordings already in that file
+#   (matched by content hash) are skipped, so an interrupted job picks up where it stopped
+#
+# Usage (from the repo root):
+#   python -m backend.batch_cli recordings/ --out outputs/batch_results.jsonl --api-workers 8 --sentiment-workers 2
+#   python -m backend.batch_cli manifest.txt      (one file path per line)
+# ─────────────────────────────────────────────────────────────────────────────
+
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".wav", ".mp4", ".webm", ".ogg")
+
+
+# --- Files to process: every audio file or .vtt/.txt transcript in a directory, or every path listed in a manifest ---
+def collect_files(source, extensions=AUDIO_EXTENSIONS + TEXT_EXTENSIONS):
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.lower().endswith(extensions)
+        )
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        paths = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in paths]    #Relative paths are relative to the manifest
+
+
+# --- Content hashes of the recordings already finished in a previous run ---
+def load_finished(out_path):
+    finished = set()
+    if not os.path.exists(out_path):
+        return finished
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:    #A line cut short by a crash is simply redone
+                continue
+            if record.get("status") == "ok":
+                finished.add(record["sha256"])
+    return finished
+
+
+# --- Sentiment worker process: loads the model once when the process starts ---
+def _init_sentiment_worker():
+    from backend.model_registry import warmup
+    warmup()
+
+
+def _sentiment(text):
+    from backend.sentiment_analysis import analyze_sentiment_windows
+    return analyze_sentiment_windows(text)
+
+
+def _speaker_sentiment(segments):
+    from backend.sentiment_analysis import analyze_segments_sentiment
+    return analyze_segments_sentiment(segments)
+
+
+def _timed(timings, stage, func, *args, **kwargs):
+    started = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[stage] = round(time.perf_counter() - started, 3)
+
+
+def _failed(output):
+    return isinstance(output, str) and output.startswith("❌")     #The backend functions return error messages instead of raising
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# process_file()
+# Purpose: Runs all stages for one recording
+# - Summary and sentiment run at the same time, suggestions wait for the sentiment
+# - .vtt/.txt transcripts skip Whisper, and those with speakers also get a per-speaker mood
+# Returns:
+#   - dict: JSON-serializable record written to the results file
+# ─────────────────────────────────────────────────────────────────────────────
+def process_file(path, digest, api_pool, sentiment_pool):
+    from backend.transcribe_whisper import transcribe_audio
+    from backend.summarize_gpt import summarize_actions, generate_suggestions
+    from backend.search_index import index_meeting
+
+    timings = {}
+    record = {"file": path, "sha256": digest, "status": "ok", "timings": timings}
+    started = time.perf_counter()
+    try:
+        speakers_future = None
+        if is_text_transcript(path):
+            ingested = _timed(timings, "read", read_transcript, path)
+            transcript = ingested["text"]
+            if has_speaker_timeline(ingested):
+                speakers_future = sentiment_pool.submit(_speaker_sentiment, ingested["segments"])
+        else:
+            transcript = api_pool.submit(_timed, timings, "transcribe", transcribe_audio, path, digest=digest,
+                                         max_workers=1).result()    #Stays within the --api-workers request limit
+            if _failed(transcript):
+                raise RuntimeError(transcript)
+        record["transcript"] = transcript
+
+        summary_future = api_pool.submit(_timed, timings, "summary", summarize_actions, transcript)
+        sentiment_started = time.perf_counter()
+        sentiment = sentiment_pool.submit(_sentiment, transcript).result()
+        timings["sentiment"] = round(time.perf_counter() - sentiment_started, 3)
+        record["sentiment"] = sentiment["sentiment"]
+        record["sentiment_confidence"] = sentiment["confidence"]
+        record["sentiment_timeline"] = sentiment["timeline"]
+        if speakers_future is not None:
+            record["speaker_sentiment"] = speakers_future.result()
+
+        suggestions = api_pool.submit(_timed, timings, "suggestions", generate_suggestions, transcript, sentiment["sentiment"]).result()
+        record["summary"] = summary_future.result()
+        record["suggestions"] = suggestions
+        if _failed(record["summary"]) or _failed(suggestions):
+            raise RuntimeError(record["summary"] if _failed(record["summary"]) else suggestions)
+        index_meeting(f"{digest[:12]}_{os.path.basename(path)}", title=os.path.basename(path), transcript=transcript,
+                      summary=record["summary"])
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# run_batch()
+# Parameters:
+#   - source (str): Directory of recordings or manifest file
+#   - out_path (str): JSONL results file (appended to, and used to resume)
+#   - api_workers (int): Maximum concurrent OpenAI requests
+#   - sentiment_workers (int): Sentiment worker processes
+# Returns:
+#   - dict: Throughput report
+# ─────────────────────────────────────────────────────────────────────────────
+def run_batch(source, out_path, api_workers=4, sentiment_workers=1):
+    files = collect_files(source)
+    finished = load_finished(out_path)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+
+    todo, unreadable, skipped = [], [], 0
+    for path in files:
+        try:
+            digest = file_digest(path)
+        except OSError as e:    #Missing or unreadable manifest entry: reported as a failure, the rest of the batch still runs
+            unreadable.append({"file": path, "sha256": None, "status": "error", "error": str(e), "timings": {}, "seconds": 0.0})
+            continue
+        if digest in finished:
+            skipped += 1
+        else:
+            todo.append((path, digest))
+    print(f"{len(files)} recordings, {skipped} already done, {len(todo)} to process, {len(unreadable)} unreadable", file=sys.stderr)
+
+    ok, failed = 0, len(unreadable)
+    stage_totals = {}
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=api_workers, thread_name_prefix="api") as api_pool, \
+            ProcessPoolExecutor(max_workers=sentiment_workers, initializer=_init_sentiment_worker) as sentiment_pool, \
+            ThreadPoolExecutor(max_workers=api_workers * 2, thread_name_prefix="file") as file_pool, \
+            open(out_path, "a", encoding="utf-8") as out:
+        for record in unreadable:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            print(f"error  {record['file']}: {record['error']}", file=sys.stderr)
+        #File drivers only wait on the other two pools, so twice api_workers keeps the API pool busy without piling up work
+        futures = {file_pool.submit(process_file, path, digest, api_pool, sentiment_pool): path for path, digest in todo}
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()     #Written as soon as it finishes, so a restart skips it
+            if record["status"] == "ok":
+                ok += 1
+                for stage, seconds in record["timings"].items():    #Failed recordings stop early and would skew the means
+                    stage_totals[stage] = stage_totals.get(stage, 0) + seconds
+            else:
+                failed += 1
+            print(f"[{ok + failed - len(unreadable)}/{len(todo)}] {record['status']:5} {record['seconds']:7.1f}s  {record['file']}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - started
+    processed = ok + failed - len(unreadable)
+    return {
+        "recordings": len(files),
+        "skipped": skipped,
+        "succeeded": ok,
+        "failed": failed,
+        "wall_seconds": round(elapsed, 1),
+        "recordings_per_minute": round(60 * processed / elapsed, 2) if elapsed and processed else 0.0,
+        "mean_stage_seconds": {stage: round(total / ok, 2) for stage, total in stage_totals.items()} if ok else {},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcribe and analyze a directory or manifest of meeting recordings.")
+    parser.add_argument("source", help="Directory of recordings, or a manifest file with one path per line")
+    parser.add_argument("--out", default=os.path.join("outputs", "batch_results.jsonl"), help="JSONL results file")
+    parser.add_argument("--api-workers", type=int, default=4, help="Maximum concurrent OpenAI requests")
+    parser.add_argument("--sentiment-workers", type=int, default=1, help="Sentiment inference processes")
+    args = parser.parse_args()
+
+    report = run_batch(args.source, args.out, args.api_workers, args.sentiment_workers)
+    print(json.dumps(report, indent=2))
@@ -1,39 +1,231 @@
+import email.utils
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from backend.instrumentation import incr, instrument, set_attribute
 
-#Fetch recrodings from the user's account
-def fetch_recordings(access_token):
+# ─────────────────────────────────────────────────────────────────────────────
+# Zoom cloud recordings
+# - One pooled requests.Session is shared by every call, so TCP/TLS connections to api.zoom.us are reused
+# - The recordings endpoint only accepts ranges of up to one month, so longer ranges are split into 30-day windows
+#   that are fetched concurrently
+# - 429 responses wait for the Retry-After header, 5xx and connection errors back off exponentially
+# - sync_recordings() keeps a checkpoint per Zoom account, so later syncs only ask for meetings since the last run
+# ─────────────────────────────────────────────────────────────────────────────
+
+ZOOM_API_BASE = os.getenv("ZOOM_API_BASE", "https://api.zoom.us/v2")
+CHECKPOINT_PATH = os.getenv("ZOOM_SYNC_CHECKPOINT", os.path.join("outputs", "zoom_sync_checkpoint.json"))
+MAX_WORKERS = int(os.getenv("ZOOM_SYNC_WORKERS", "4"))
+WINDOW_DAYS = 30
+TIMEOUT = (5, 30)   #(connect, read) seconds
+MAX_RETRIES = 5
+
+logger = logging.getLogger("briefly.zoom")
+
+_session = None
+_session_lock = threading.Lock()
+_checkpoint_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the shared requests.Session, with a connection pool large enough for all sync workers.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(MAX_WORKERS, 10))
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+    return _session
+
+
+# --- Seconds to wait before retrying, from Retry-After (seconds or HTTP date) or exponential backoff with jitter ---
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+            return max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            pass
+    return min(2 ** attempt, 30) + random.uniform(0, 0.5)   #Jitter keeps concurrent workers from retrying in lockstep
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# zoom_get()
+# Purpose: GET a Zoom API path with timeout, rate-limit handling and retries
+# Raises:
+#   - RuntimeError: on a non-retryable error status or once all retries are used up
+# ─────────────────────────────────────────────────────────────────────────────
+def zoom_get(access_token, path, params=None):
     headers = {
         "Authorization": f"Bearer {access_token.strip()}"
     }
+    url = f"{ZOOM_API_BASE}{path}"
+    response = None
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = get_session().get(url, headers=headers, params=params, timeout=TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"Zoom API unreachable: {e}")
+            incr("zoom_retries_total", reason="connection")
+            time.sleep(_retry_delay(None, attempt))
+            continue
+
+        incr("zoom_requests_total", status=response.status_code)
+        incr("zoom_response_bytes_total", len(response.content))
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code == 429 or response.status_code >= 500:     #Rate limited or server error: worth retrying
+            if attempt < MAX_RETRIES:
+                incr("zoom_retries_total", reason=response.status_code)
+                time.sleep(_retry_delay(response, attempt))
+                continue
+        break
+
+    raise RuntimeError(f"Zoom API error {response.status_code}: {response.text}")
+
+
+# --- Split [since, until] into ranges of at most WINDOW_DAYS days ---
+def date_windows(since, until, days=WINDOW_DAYS):
+    windows = []
+    start = since
+    while start <= until:
+        end = min(start + timedelta(days=days - 1), until)
+        windows.append((start, end))
+        start = end + timedelta(days=1)
+    return windows
+
 
-    url = "https://api.zoom.us/v2/users/me/recordings"
-    
+def _to_recording(meeting):
+    files = meeting.get("recording_files", [])
+    #Prefer the audio-only track (smallest download), then the video, then whatever is there
+    preferred = sorted(files, key=lambda f: {"M4A": 0, "MP4": 1}.get(f.get("file_type"), 2))
+    return {
+        "id": meeting.get("uuid") or meeting.get("id"),
+        "topic":meeting.get("topic"),
+        "download_url": preferred[0].get("download_url") if preferred else meeting.get("download_url"),
+        "start_time":meeting.get("start_time"),
+        "duration": meeting.get("duration", 0),
+        "file_type": preferred[0].get("file_type") if preferred else None,
+        "file_size": preferred[0].get("file_size") if preferred else None,
+    }
+
+
+# --- All pages of one date window ---
+def _fetch_window(access_token, start, end):
     recordings = []
     page_token = None #To handle pagination. The URL returns a page_token if there are more results are available on the next page. When returned, we will fetch the results till this token is returned empty
 
     while True:
-        params = {} #Fetching the page token param to fetch recodings from multiple pages, when available
+        params = {"from": start.isoformat(), "to": end.isoformat(), "page_size": 300}   #300 is the largest page Zoom allows
         if page_token:
-            params["page_token"] = page_token
-            
-        response = requests.get(url, headers=headers, params=params)
+            params["next_page_token"] = page_token
+        data = zoom_get(access_token, "/users/me/recordings", params)
+        recordings.extend(_to_recording(meeting) for meeting in data.get("meetings", []))
+        page_token = data.get("next_page_token")
+        if not page_token:
+            break   #No more pages
+    return recordings
 
-        if response.status_code == 200:
-            data = response.json()
-            for meeting in data.get("meetings", []):
-                recordings.append({
-                    "topic":meeting.get("topic"), 
-                    "download_url": meeting.get("download_url"), 
-                    "start_time":meeting.get("start_time")
-                })
-            page_token = data.get("next_page_token")
-            if not page_token:
-                break   #No more pages
-        
-        else:
-            print("Failed to fetch recordings:")
-            print("Status code:", response.status_code)
-            print("Response:", response.text)
-            break
-        
-    return recordings
\ No newline at end of file
+
+def _fetch_range(access_token, since, until, max_workers):
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="zoom") as pool:
+        pages = pool.map(lambda w: _fetch_window(access_token, *w), date_windows(since, until))
+        recordings = {}
+        for window in pages:
+            for rec in window:
+                recordings[rec["id"]] = rec     #A meeting can show up in two windows if it spans midnight
+    return sorted(recordings.values(), key=lambda r: r.get("start_time") or "", reverse=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# fetch_recordings()
+# Purpose: Fetch recordings from the user's account
+# Parameters:
+#   - access_token (str): Zoom OAuth access token
+#   - since (date): First day to list (defaults to 30 days ago)
+#   - until (date): Last day to list (defaults to today)
+# Returns:
+#   - list[dict]: Recordings, newest first, or an empty list if Zoom keeps failing (the error is logged)
+# ─────────────────────────────────────────────────────────────────────────────
+@instrument("zoom_list")
+def fetch_recordings(access_token, since=None, until=None, max_workers=MAX_WORKERS):
+    until = until or date.today()
+    since = since or until - timedelta(days=WINDOW_DAYS - 1)
+    set_attribute(days=(until - since).days + 1)
+    try:
+        recordings = _fetch_range(access_token, since, until, max_workers)
+    except RuntimeError as e:
+        logger.warning("Failed to fetch recordings: %s", e)
+        set_attribute(error=str(e))
+        return []
+    set_attribute(recordings=len(recordings))
+    return recordings
+
+
+def _load_checkpoints(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# sync_recordings()
+# Purpose: Incremental listing of all recordings of the signed-in account
+# - First sync lists the last lookback_days days, later syncs only ask Zoom for meetings since the previous sync
+#   (that day included, to catch recordings that finished processing late) and merge them with the stored list
+# - Checkpoints are keyed by the Zoom user id from /users/me. A token without the scope to read it still lists its
+#   recordings through the "me" alias, but every sync is then a full lookback and nothing is stored, so accounts
+#   sharing this server can never see each other's checkpoint
+# Parameters:
+#   - access_token (str): Zoom OAuth access token
+#   - lookback_days (int): How far back the first sync goes
+#   - checkpoint_path (str): JSON file holding one checkpoint per Zoom account
+# Returns:
+#   - list[dict]: All known recordings, newest first
+# Raises:
+#   - RuntimeError: if Zoom keeps failing; the checkpoint is then left untouched
+# ─────────────────────────────────────────────────────────────────────────────
+def sync_recordings(access_token, lookback_days=365, checkpoint_path=CHECKPOINT_PATH, max_workers=MAX_WORKERS):
+    today = date.today()
+    try:
+        account_id = zoom_get(access_token, "/users/me").get("id")  #Checkpoints are per Zoom account, tokens change every hour
+    except RuntimeError as e:
+        logger.warning("Zoom user id unavailable (%s), syncing without a checkpoint", e)
+        account_id = None
+    if account_id is None:
+        return _fetch_range(access_token, today - timedelta(days=lookback_days), today, max_workers)
+
+    with _checkpoint_lock:
+        checkpoint = _load_checkpoints(checkpoint_path).get(account_id, {})
+    since = date.fromisoformat(checkpoint["last_sync"]) if checkpoint.get("last_sync") else today - timedelta(days=lookback_days)
+
+    known = {rec["id"]: rec for rec in checkpoint.get("recordings", [])}
+    for rec in _fetch_range(access_token, since, today, max_workers):
+        known[rec["id"]] = rec
+    recordings = sorted(known.values(), key=lambda r: r.get("start_time") or "", reverse=True)
+
+    with _checkpoint_lock:
+        checkpoints = _load_checkpoints(checkpoint_path)
+        checkpoints[account_id] = {"last_sync": today.isoformat(), "recordings": recordings}
+        os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoints, f)
+        os.replace(tmp_path, checkpoint_path)   #Atomic, an interrupted sync never leaves a half-written checkpoint
+    return recordings
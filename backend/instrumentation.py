@@ -0,0 +1,297 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Instrumentation
+# - Spans: one per instrumented call (transcribe, summary, suggestions, sentiment, zoom listing) with its duration,
+#   status and attributes such as bytes uploaded or tokens used. Spans nest, so a GPT request made inside
+#   summarize_actions is recorded as its child. Work handed to a thread pool only nests when it is submitted through
+#   in_current_context(), as the map-reduce chunk summaries are
+# - Counters: running totals (requests, retries, tokens, bytes, cache hits...) with labels
+# - Export: export_json() for dashboards / tests, render_prometheus() for a Prometheus-style text endpoint
+#   (start_metrics_server(), or set BRIEFLY_METRICS_PORT), and one JSON log line per span with BRIEFLY_METRICS_LOG=1
+# - Profiling: BRIEFLY_PROFILE_STAGE=<stage> captures a cProfile of the next call of that stage to outputs/profiles/
+# ─────────────────────────────────────────────────────────────────────────────
+
+LOG_SPANS = os.getenv("BRIEFLY_METRICS_LOG") == "1"
+PROFILE_DIR = os.getenv("BRIEFLY_PROFILE_DIR", os.path.join("outputs", "profiles"))
+RECENT_SPANS = 200  #Spans kept in memory for export_json()
+
+logger = logging.getLogger("briefly.metrics")
+
+_lock = threading.Lock()
+_counters = {}      #(name, sorted label items) -> value
+_durations = {}     #(span name, status) -> [count, total seconds, max seconds]
+_recent = deque(maxlen=RECENT_SPANS)
+_current = contextvars.ContextVar("briefly_span", default=None)
+_profile_stage = os.getenv("BRIEFLY_PROFILE_STAGE")
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def incr(name, value=1, **labels):
+    """
+    Adds value to the counter `name` with the given labels, e.g. incr("openai_tokens_total", 350, kind="prompt").
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def set_attribute(**attributes):
+    """
+    Adds attributes to the span of the call currently running (no-op outside a span).
+    """
+    span = _current.get()
+    if span is not None:
+        span["attributes"].update(attributes)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# span()
+# Purpose: Context manager timing one unit of work
+# Parameters:
+#   - name (str): Span name, e.g. "summary"
+#   - **attributes: Initial attributes
+# Yields:
+#   - dict: The span, its "attributes" can be updated while it runs
+# ─────────────────────────────────────────────────────────────────────────────
+@contextmanager
+def span(name, **attributes):
+    parent = _current.get()
+    record = {
+        "name": name,
+        "parent": parent["name"] if parent else None,
+        "start": time.time(),
+        "attributes": attributes,
+        "status": "ok",
+    }
+    token = _current.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record["status"] = "error"
+        record["attributes"]["error"] = str(e)
+        raise
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:  #A streaming span closed from another thread (e.g. a garbage collected generator)
+            pass
+        seconds = time.perf_counter() - started
+        record["seconds"] = round(seconds, 4)
+        with _lock:
+            totals = _durations.setdefault((name, record["status"]), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+            _recent.append(record)
+        if LOG_SPANS:
+            logger.info(json.dumps({"type": "span", **record}, default=str))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# instrument()
+# Purpose: Decorator wrapping every call of a backend function in a span
+# - The backend functions report failures by returning a "❌ ..." message, those calls get status "error"
+# - The stage named in BRIEFLY_PROFILE_STAGE is profiled once (see profile())
+# Parameters:
+#   - name (str): Span / stage name
+# ─────────────────────────────────────────────────────────────────────────────
+def instrument(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global _profile_stage
+            profile_this = False
+            if _profile_stage == name:
+                with _lock:
+                    if _profile_stage == name:  #Only the next call is profiled, concurrent calls of the stage are not
+                        profile_this, _profile_stage = True, None
+            with span(name) as record:
+                if profile_this:
+                    with profile(name):
+                        result = func(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+                if isinstance(result, str) and result.startswith("❌"):
+                    record["status"] = "error"
+                    record["attributes"]["error"] = result[:200]
+                return result
+        return wrapper
+    return decorator
+
+
+def instrument_stream(name):
+    """
+    instrument() for generator functions: the span covers the whole iteration, not just the call creating the generator.
+    A stream whose first chunk is a "❌ ..." message, or that raises midway, gets status "error". One closed before its
+    end is marked cancelled.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, streamed=True) as record:
+                chunks = func(*args, **kwargs)
+                try:
+                    for i, chunk in enumerate(chunks):
+                        if i == 0 and isinstance(chunk, str) and chunk.startswith("❌"):
+                            record["status"] = "error"
+                            record["attributes"]["error"] = chunk[:200]
+                        yield chunk
+                except GeneratorExit:
+                    record["attributes"]["cancelled"] = True
+                    raise
+                finally:
+                    chunks.close()
+        return wrapper
+    return decorator
+
+
+def in_current_context(func):
+    """
+    Returns func bound to a copy of the caller's context, for thread pools: spans opened by func in a worker thread are
+    then children of the caller's span. Every call gets its own copy, so the result can be mapped over concurrently.
+    """
+    context = contextvars.copy_context()
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# profile()
+# Purpose: Captures a cProfile of the code inside the with-block (the calling thread only)
+# - Writes <PROFILE_DIR>/<name>_<timestamp>.prof (open with snakeviz or pstats) and a .txt with the top 40 functions
+# Yields:
+#   - dict: {"path", "summary_path"} filled in when the block ends
+# ─────────────────────────────────────────────────────────────────────────────
+@contextmanager
+def profile(name):
+    profiler = cProfile.Profile()
+    paths = {}
+    profiler.enable()
+    try:
+        yield paths
+    finally:
+        profiler.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        base = os.path.join(PROFILE_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+        profiler.dump_stats(f"{base}.prof")
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(40)
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        paths.update(path=f"{base}.prof", summary_path=f"{base}.txt")
+        set_attribute(profile=paths["path"])
+
+
+def export_json():
+    """
+    Returns counters, per-span duration totals and the most recent spans as a JSON-serializable dict.
+    """
+    with _lock:
+        return {
+            "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in _counters.items()],
+            "durations": [
+                {"span": name, "status": status, "count": count, "total_seconds": round(total, 4), "max_seconds": round(peak, 4)}
+                for (name, status), (count, total, peak) in _durations.items()
+            ],
+            "recent_spans": list(_recent),
+        }
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels) + "}"
+
+
+def render_prometheus():
+    """
+    Returns all counters and span durations in the Prometheus text exposition format.
+    """
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        durations = sorted(_durations.items())
+    seen = set()
+    for (name, labels), value in counters:
+        metric = f"briefly_{name}"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_labels(labels)} {value}")
+    lines.append("# TYPE briefly_span_seconds summary")
+    for (name, status), (count, total, _) in durations:
+        labels = _labels((("span", name), ("status", status)))
+        lines.append(f"briefly_span_seconds_count{labels} {count}")
+        lines.append(f"briefly_span_seconds_sum{labels} {round(total, 6)}")
+    lines.append("# TYPE briefly_span_seconds_max gauge")
+    for (name, status), (_, _, peak) in durations:
+        lines.append(f"briefly_span_seconds_max{_labels((('span', name), ('status', status)))} {round(peak, 6)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(export_json(), default=str).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = render_prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+
+
+def start_metrics_server(port=None, host="127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /metrics.json on a daemon thread. Only the first call starts a server.
+    """
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, int(port or os.getenv("BRIEFLY_METRICS_PORT", "9464"))), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+def reset():
+    """
+    Clears all counters and spans (for benchmarks and tests).
+    """
+    with _lock:
+        _counters.clear()
+        _durations.clear()
+        _recent.clear()
+
+
+if os.getenv("BRIEFLY_METRICS_PORT"):
+    start_metrics_server()
@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Background jobs
+# - Long work (Whisper, GPT, sentiment) runs on worker threads instead of inside the Streamlit script, so a session is
+#   never blocked and a page refresh doesn't lose anything: the UI submits a job and polls its status
+# - Jobs and their results are stored in SQLite (outputs/jobs.db), so they survive reloads and app restarts.
+#   Jobs that were running when the app stopped are queued again on the next start
+# - BRIEFLY_JOB_WORKERS jobs run at the same time overall, and at most BRIEFLY_JOBS_PER_USER per owner, so one user
+#   submitting a pile of recordings can't starve everyone else
+# ─────────────────────────────────────────────────────────────────────────────
+
+DB_PATH = os.getenv("BRIEFLY_JOB_DB", os.path.join("outputs", "jobs.db"))
+WORKERS = int(os.getenv("BRIEFLY_JOB_WORKERS", "4"))
+PER_OWNER_LIMIT = int(os.getenv("BRIEFLY_JOBS_PER_USER", "2"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job store with a pool of worker threads.
+    Args:
+        db_path (str): SQLite file holding the jobs.
+        workers (int): Jobs running at the same time.
+        per_owner_limit (int): Jobs of one owner running at the same time.
+    """
+    def __init__(self, db_path=DB_PATH, workers=WORKERS, per_owner_limit=PER_OWNER_LIMIT):
+        self.db_path = db_path
+        self.workers = workers
+        self.per_owner_limit = per_owner_limit
+        self.handlers = {}
+        self._claim_lock = threading.Lock()     #Claiming a job is read-then-write, only one worker at a time
+        self._wakeup = threading.Condition()
+        self._threads = []
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            conn.execute("UPDATE jobs SET status = ?, progress = 'requeued after restart' WHERE status = ?", (QUEUED, RUNNING))
+
+    @contextmanager
+    def _connect(self):
+        #One short-lived connection per operation: sqlite3 connections must not be shared between threads
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")     #Readers (the polling UI) don't block the writing workers
+        try:
+            with conn:  #Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Handlers: handler(payload, progress) -> JSON-serializable result; progress(text) updates the job status line ---
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def start(self):
+        if self._threads:
+            return self
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # submit()
+    # Parameters:
+    #   - kind (str): Registered handler name
+    #   - payload (dict): JSON-serializable input of the handler
+    #   - owner (str): Who submitted the job, used for the per-owner limit
+    # Returns:
+    #   - str: Job id
+    # ─────────────────────────────────────────────────────────────────────────
+    def submit(self, kind, payload, owner="anonymous"):
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, owner, status, progress, payload, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, owner, QUEUED, "waiting for a worker", json.dumps(payload), time.time()),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Returns the job as a dict (payload and result decoded), or None if there is no such job.
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def list_jobs(self, owner=None, limit=20):
+        with self._connect() as conn:
+            if owner:
+                rows = conn.execute("SELECT id, kind, owner, status, progress, created_at, finished_at FROM jobs "
+                                    "WHERE owner = ? ORDER BY created_at DESC LIMIT ?", (owner, limit)).fetchall()
+            else:
+                rows = conn.execute("SELECT id, kind, owner, status, progress, created_at, finished_at FROM jobs "
+                                    "ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def _set(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    # --- Oldest queued job whose owner is under the per-owner limit, marked running ---
+    def _claim(self):
+        with self._claim_lock, self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT id, kind, payload FROM jobs
+                WHERE status = ? AND owner NOT IN (
+                    SELECT owner FROM jobs WHERE status = ? GROUP BY owner HAVING COUNT(*) >= ?
+                )
+                ORDER BY created_at LIMIT 1
+                """,
+                (QUEUED, RUNNING, self.per_owner_limit),
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = ?, progress = 'started', started_at = ? WHERE id = ?",
+                             (RUNNING, time.time(), row["id"]))
+        return row
+
+    def _work(self):
+        while True:
+            row = self._claim()
+            if row is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)  #Woken up by submit(), or re-checks every second (e.g. owner limit freed)
+                continue
+            job_id = row["id"]
+            try:
+                result = self.handlers[row["kind"]](json.loads(row["payload"]), lambda text: self._set(job_id, progress=text))
+                self._set(job_id, status=DONE, progress="finished", result=json.dumps(result), finished_at=time.time())
+            except Exception as e:
+                self._set(job_id, status=FAILED, progress="failed", error=str(e), finished_at=time.time())
+            with self._wakeup:
+                self._wakeup.notify()   #A slot of this owner is free again
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# analyze_recording_job()
+# Purpose: Job handler: transcribe a recording, save the transcript, then run the analysis pipeline
+# - .vtt/.txt files are already transcripts: they are parsed locally (backend/text_ingest.py) instead of going to
+#   Whisper, and their speakers and timestamps add a per-speaker mood to the analysis
+# Parameters:
+#   - payload (dict): {"audio_path", "file_id", "file_name", "stages"} where stages optionally limits the analysis
+#     (e.g. ["sentiment"] when the UI streams the GPT output itself)
+#   - progress (callable): Status line updates
+# Returns:
+#   - dict: {"transcript", "transcript_path", "analysis"}
+# ─────────────────────────────────────────────────────────────────────────────
+def analyze_recording_job(payload, progress):
+    from backend.pipeline import analyze_transcript
+    from backend.search_index import index_meeting
+    from backend.text_ingest import has_speaker_timeline, is_text_transcript, read_transcript
+
+    segments = None
+    if is_text_transcript(payload["audio_path"]):
+        progress("Reading the transcript...")
+        ingested = read_transcript(payload["audio_path"])
+        transcript = ingested["text"]
+        if not transcript:
+            raise RuntimeError("The transcript file is empty.")
+        if has_speaker_timeline(ingested):
+            segments = ingested["segments"]
+    else:
+        from backend.transcribe_whisper import transcribe_audio
+        progress("Transcribing with Whisper...")
+        transcript = transcribe_audio(payload["audio_path"])
+        if transcript.startswith("❌"):
+            raise RuntimeError(transcript)
+
+    transcript_path = os.path.join("outputs", f"{payload['file_id']}_transcript.txt")
+    os.makedirs("outputs", exist_ok=True)
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write(transcript)
+    index_meeting(payload["file_id"], title=payload.get("file_name"), transcript=transcript, transcript_path=transcript_path)
+
+    progress("Analyzing the meeting...")
+    analysis = analyze_transcript(transcript, payload.get("stages"), segments=segments)
+    if "summary" in analysis["results"]:
+        index_meeting(payload["file_id"], summary=analysis["results"]["summary"])
+    return {"transcript": transcript, "transcript_path": transcript_path, "analysis": analysis}
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Returns the process-wide JobQueue (shared by all Streamlit sessions), started on first use.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+            _queue.register("analyze_recording", analyze_recording_job)
+            _queue.start()
+    return _queue
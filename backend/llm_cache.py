@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LLM response cache
+# - GPT responses are keyed by model, temperature, prompt template name + version and a hash of the prompt inputs, so
+#   re-running an unchanged analysis comes back instantly without spending tokens. Bumping a template version in
+#   summarize_gpt.py invalidates only the responses of that template
+# - Two levels: an in-memory LRU (LLM_CACHE_MEMORY_ENTRIES) in front of a SQLite store shared by all processes
+# - Disk entries expire after LLM_CACHE_TTL_HOURS and the least recently used are evicted beyond LLM_CACHE_MAX_MB
+# - stats() reports hits, misses, hit rate and the tokens the hits saved
+# ─────────────────────────────────────────────────────────────────────────────
+
+DB_PATH = os.getenv("LLM_CACHE_DB", os.path.join("outputs", "cache", "llm_cache.db"))
+MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024)
+ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at);
+"""
+
+
+def make_key(model, temperature, template, template_version, inputs):
+    """
+    Returns the cache key of one completion request.
+    Args:
+        model (str): Model name, e.g. gpt-4o.
+        temperature (float): Sampling temperature.
+        template (str): Prompt template name.
+        template_version (str): Bumped whenever the template text changes.
+        inputs (dict): Values filled into the template (transcript, sentiment, ...).
+    """
+    inputs_hash = hashlib.sha256(json.dumps(inputs, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return hashlib.sha256(f"{model}|{temperature}|{template}|{template_version}|{inputs_hash}".encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    In-memory LRU backed by a SQLite store, with TTL and size eviction.
+    """
+    def __init__(self, db_path=DB_PATH, memory_entries=MEMORY_ENTRIES, ttl_seconds=TTL_SECONDS, max_bytes=MAX_BYTES):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()    #key -> (response, tokens, created_at)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0, "tokens_saved": 0}
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)    #Least recently used
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # get()
+    # Returns:
+    #   - str: Cached response, or None on a miss (unknown or expired key)
+    # ─────────────────────────────────────────────────────────────────────────
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[2] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+        if entry is not None and now - entry[2] <= self.ttl_seconds:
+            self._count("memory_hits")
+            self._count("tokens_saved", entry[1])
+            return entry[0]
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT response, tokens, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+        if row is None:
+            self._count("misses")
+            return None
+        self._remember(key, tuple(row))
+        self._count("disk_hits")
+        self._count("tokens_saved", row[1])
+        return row[0]
+
+    def put(self, key, response, tokens=0):
+        """
+        Stores a response. tokens is the total token count the request cost, credited to tokens_saved on later hits.
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        self._remember(key, (response, tokens, now))
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses (key, response, tokens, size, created_at, last_used_at) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (key, response, tokens, size, now, now))
+        self._count("writes")
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes expired entries, then the least recently used ones until the store is under max_bytes.
+        Returns the number of entries removed.
+        """
+        removed = 0
+        with self._connect() as conn:
+            removed += conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used_at").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    total -= size
+                    removed += 1
+        if removed:
+            self._count("evictions", removed)
+        return removed
+
+    def stats(self):
+        """
+        Returns the hit/miss counters of this process, the hit rate and the tokens saved by hits.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the process-wide LLMCache, or None when caching is turned off with LLM_CACHE=0.
+    """
+    global _cache
+    if not ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+    return _cache
@@ -0,0 +1,210 @@
+import os
+import sys
+import threading
+import time
+from backend.instrumentation import incr, set_attribute
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Model registry
+# - Loads the RoBERTa sentiment tokenizer and model once per process, on first use (or eagerly through warmup())
+# - Streamlit runs every browser session as a thread of the same process, so all sessions share the one copy held here
+# - Reads from SENTIMENT_MODEL_DIR or the Hugging Face cache without touching the network. The model is only downloaded
+#   when it is missing locally, and never when BRIEFLY_OFFLINE=1 (or HF_HUB_OFFLINE=1) is set
+# - transformers is imported inside the loader, so importing this module stays cheap
+#
+# Inference backends (SENTIMENT_BACKEND, CPU only):
+# - "fp32": the plain PyTorch model (default)
+# - "int8": the same model with its Linear layers dynamically quantized to int8 (torch.quantization.quantize_dynamic)
+# - "onnx": the model exported once to ONNX and run with onnxruntime (pip install onnxruntime)
+# SENTIMENT_THREADS sets the number of intra-op CPU threads used by whichever backend is selected
+# ─────────────────────────────────────────────────────────────────────────────
+
+MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
+MODEL_DIR = os.getenv("SENTIMENT_MODEL_DIR")   #Optional local directory holding a save_pretrained() copy of the model
+BACKENDS = ("fp32", "int8", "onnx")
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "fp32")
+ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH", os.path.join(MODEL_DIR or "models", "twitter-roberta-base-sentiment.onnx"))
+
+_lock = threading.Lock()    #Makes sure two sessions clicking at the same time don't both load the model
+_models = {}    #backend name -> (tokenizer, model)
+_warmup_thread = None
+_load_stats = {}    #backend name -> stats of its load
+
+
+# --- Resident memory of this process ---
+def current_rss_mb():
+    """
+    Returns the resident set size of the current process in MB (peak RSS where the current value is not available).
+    """
+    try:
+        with open("/proc/self/status") as f:    #Linux: current resident memory
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource     #Not available on Windows
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)    #Bytes on macOS, KB on Linux
+    except ImportError:
+        return None
+
+
+def _offline():
+    return os.getenv("BRIEFLY_OFFLINE") == "1" or os.getenv("HF_HUB_OFFLINE") == "1"
+
+
+def _threads():
+    value = os.getenv("SENTIMENT_THREADS")
+    return int(value) if value else None
+
+
+# --- Load tokenizer & fp32 model from local files, downloading only when they are missing ---
+def _load_pretrained():
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    source = MODEL_DIR if MODEL_DIR and os.path.isdir(MODEL_DIR) and os.listdir(MODEL_DIR) else MODEL_NAME
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(source, local_files_only=True)
+        model = AutoModelForSequenceClassification.from_pretrained(source, local_files_only=True)
+        origin = "local"
+    except OSError:
+        if _offline():
+            raise RuntimeError(f"Sentiment model not found locally ({source}) and offline mode is on.")
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+        origin = "download"
+        if MODEL_DIR:   #Keep a local copy so the next cold start never needs the network
+            tokenizer.save_pretrained(MODEL_DIR)
+            model.save_pretrained(MODEL_DIR)
+    model.eval()    #Inference only: disables dropout
+    return tokenizer, model, source, origin
+
+
+# --- ONNX Runtime wrapper with the same call signature as the PyTorch model ---
+class OnnxSequenceClassifier:
+    """
+    Runs an exported ONNX graph with onnxruntime and returns an object with a .logits tensor,
+    so sentiment_analysis.py can call it exactly like the PyTorch model.
+    """
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def __call__(self, input_ids, attention_mask, **kwargs):
+        import torch
+        from types import SimpleNamespace
+        logits = self.session.run(["logits"], {
+            "input_ids": input_ids.numpy(),
+            "attention_mask": attention_mask.numpy(),
+        })[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def _export_onnx(model, tokenizer, path):
+    import torch
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    sample = tokenizer("brieFly export sample", return_tensors="pt")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={     #Batch size and sequence length change from call to call
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=14,
+    )
+
+
+def _load_sentiment(backend):
+    import torch
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend '{backend}'. Choose one of {BACKENDS}.")
+    threads = _threads()
+    if threads:
+        torch.set_num_threads(threads)
+
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    tokenizer, model, source, origin = _load_pretrained()
+    if backend == "int8":
+        #Replace every nn.Linear with an int8 version whose activations are quantized on the fly
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend == "onnx":
+        try:
+            import onnxruntime  # noqa: F401
+        except ImportError:
+            raise RuntimeError("The onnx sentiment backend needs onnxruntime: pip install onnxruntime")
+        if not os.path.exists(ONNX_PATH):   #Export once, later loads reuse the file
+            _export_onnx(model, tokenizer, ONNX_PATH)
+        model = OnnxSequenceClassifier(ONNX_PATH, threads)
+        source = ONNX_PATH
+
+    stats = _load_stats[backend] = {
+        "model": MODEL_NAME,
+        "backend": backend,
+        "threads": threads or torch.get_num_threads(),
+        "source": source,
+        "origin": origin,
+        "load_seconds": round(time.perf_counter() - started, 3),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": current_rss_mb(),
+    }
+    incr("sentiment_model_loads_total", backend=backend)
+    incr("sentiment_model_load_seconds_total", stats["load_seconds"], backend=backend)
+    set_attribute(model_load_seconds=stats["load_seconds"])     #Attributed to the sentiment call that paid for the load
+    return tokenizer, model
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# get_sentiment_model()
+# Purpose: Returns the shared (tokenizer, model) pair, loading it on the first call
+# Parameters:
+#   - backend (str): "fp32", "int8" or "onnx" (defaults to SENTIMENT_BACKEND)
+# ─────────────────────────────────────────────────────────────────────────────
+def get_sentiment_model(backend=None):
+    backend = backend or DEFAULT_BACKEND
+    if backend not in _models:
+        with _lock:
+            if backend not in _models:  #Another thread may have finished loading while we waited for the lock
+                _models[backend] = _load_sentiment(backend)
+    return _models[backend]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# warmup()
+# Purpose: Loads the model before the first "Get Meeting Mood" click
+# Parameters:
+#   - background (bool): Load on a daemon thread and return immediately
+#   - backend (str): Backend to load (defaults to SENTIMENT_BACKEND)
+# Returns:
+#   - threading.Thread if background, else the load stats dict
+# ─────────────────────────────────────────────────────────────────────────────
+def warmup(background=False, backend=None):
+    global _warmup_thread
+    if background:
+        with _lock:
+            if _warmup_thread is None:  #Streamlit reruns the script on every click, only the first call starts a thread
+                _warmup_thread = threading.Thread(target=get_sentiment_model, args=(backend,), name="sentiment-warmup", daemon=True)
+                _warmup_thread.start()
+        return _warmup_thread
+    get_sentiment_model(backend)
+    return load_stats(backend)
+
+
+def load_stats(backend=None):
+    """
+    Returns how the model was loaded (backend, source, origin, load time, RSS before/after) plus the current RSS.
+    """
+    backend = backend or DEFAULT_BACKEND
+    return {**_load_stats.get(backend, {}), "loaded": backend in _models, "rss_now_mb": current_rss_mb()}
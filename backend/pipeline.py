@@ -0,0 +1,144 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Analysis pipeline
+# - Each Stage declares the stages it depends on. Pipeline.run() starts every stage as soon as its dependencies are done,
+#   so independent stages run at the same time
+# - All stages run on threads: the GPT calls spend their time waiting on the network, and PyTorch releases the GIL
+#   during inference, so the local sentiment model runs alongside them
+# - End-to-end time is roughly the slowest branch instead of the sum of all stages
+# ─────────────────────────────────────────────────────────────────────────────
+
+class Stage:
+    """
+    One step of the pipeline.
+    Args:
+        name (str): Key under which the stage result is stored.
+        func (callable): Called with a dict holding the pipeline inputs plus the results of the stages it depends on.
+        depends_on (tuple[str]): Names of the stages that must finish first.
+    """
+    def __init__(self, name, func, depends_on=()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class Pipeline:
+    """
+    Runs a set of Stages as a dependency graph on a thread pool.
+    """
+    def __init__(self, stages, max_workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers or len(self.stages)
+        for stage in stages:
+            missing = [d for d in stage.depends_on if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {missing}")
+
+    def _timed(self, stage, context):
+        started = time.perf_counter()
+        try:
+            return stage.func(context), None, time.perf_counter() - started
+        except Exception as e:
+            return None, e, time.perf_counter() - started
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # run()
+    # Parameters:
+    #   - **inputs: Values available to every stage (e.g. transcript="...")
+    # Returns:
+    #   - dict: {"results": {stage: value}, "timings": {stage: seconds}, "errors": {stage: message}, "total_seconds": float}
+    #     A stage whose dependency failed is skipped and reported in errors
+    # ─────────────────────────────────────────────────────────────────────────
+    def run(self, **inputs):
+        results, timings, errors = {}, {}, {}
+        pending = dict(self.stages)
+        running = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if any(d in errors for d in stage.depends_on):
+                        errors[name] = f"skipped: depends on failed stage(s) {[d for d in stage.depends_on if d in errors]}"
+                        del pending[name]
+                    elif all(d in results for d in stage.depends_on):
+                        context = {**inputs, **{d: results[d] for d in stage.depends_on}}
+                        running[pool.submit(self._timed, stage, context)] = name
+                        del pending[name]
+                if not running:
+                    if pending:     #Nothing can run and nothing is running: the remaining stages form a cycle
+                        raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    value, error, seconds = future.result()
+                    timings[name] = round(seconds, 3)
+                    if error is None:
+                        results[name] = value
+                    else:
+                        errors[name] = str(error)
+
+        return {
+            "results": results,
+            "timings": timings,
+            "errors": errors,
+            "total_seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+# --- Stages of the meeting analysis | backend modules are imported on first use so torch only loads when needed ---
+def _summary(context):
+    from backend.summarize_gpt import summarize_actions
+    return summarize_actions(context["transcript"])
+
+
+def _sentiment(context):
+    from backend.sentiment_analysis import analyze_sentiment_windows
+    return analyze_sentiment_windows(context["transcript"])
+
+
+def _suggestions(context):
+    from backend.summarize_gpt import generate_suggestions
+    return generate_suggestions(context["transcript"], context["sentiment"]["sentiment"])
+
+
+def _speakers(context):
+    from backend.sentiment_analysis import analyze_segments_sentiment
+    return analyze_segments_sentiment(context["segments"])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# build_analysis_pipeline()
+# Purpose: summary and sentiment run side by side, suggestions start as soon as the sentiment is known
+#
+#   transcript ──► summary
+#              └─► sentiment ──► suggestions
+#   segments   ──► speakers (mood per speaker and time slice, only for transcripts with speakers/timestamps)
+# Parameters:
+#   - stages (iterable[str]): Only build these stages (their dependencies must be included), defaults to all
+#   - speakers (bool): Add the speakers stage, which needs a segments input
+# ─────────────────────────────────────────────────────────────────────────────
+def build_analysis_pipeline(stages=None, speakers=False):
+    all_stages = [
+        Stage("summary", _summary),
+        Stage("sentiment", _sentiment),
+        Stage("suggestions", _suggestions, depends_on=("sentiment",)),
+    ]
+    selected = [stage for stage in all_stages if stages is None or stage.name in stages]
+    if speakers:
+        selected.append(Stage("speakers", _speakers))
+    return Pipeline(selected)
+
+
+def analyze_transcript(transcript, stages=None, segments=None):
+    """
+    Runs summary, sentiment and suggestions (or only the given stages) for a transcript and returns Pipeline.run()'s dict.
+    segments (from backend/text_ingest.py) adds the per-speaker / per-time-slice mood under results["speakers"].
+    A transcription error message ("❌ ...") is not analyzed: it is returned as the "transcript" error.
+    """
+    if transcript.startswith("❌"):
+        return {"results": {}, "timings": {}, "errors": {"transcript": transcript.lstrip("❌ ")}, "total_seconds": 0.0}
+    return build_analysis_pipeline(stages, speakers=bool(segments)).run(transcript=transcript, segments=segments)
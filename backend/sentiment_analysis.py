@@ -1,14 +1,24 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import os
 import torch
 torch.classes.__path__ = []     #manually sets the __path__ attribute so Python doesn’t try to look for submodules inside torch.classes
 import numpy as np
 import emoji
 import re
+import threading
+import time
+from backend.instrumentation import incr, instrument, set_attribute
+from backend.model_registry import DEFAULT_BACKEND, get_sentiment_model
+from backend.sentiment_scheduler import MicroBatchScheduler
 
 #Disable parallel processing in Hugging Face's tokenizer library to avoid warnings or potential deadlocks when using multiprocessing (e.g. in Streamlit)
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+#All model calls of the process go through one micro-batching scheduler per backend (see backend/sentiment_scheduler.py)
+SCHEDULER = os.getenv("SENTIMENT_SCHEDULER", "1") != "0"
+MAX_BATCH = int(os.getenv("SENTIMENT_MAX_BATCH", "16"))
+MAX_WAIT_MS = float(os.getenv("SENTIMENT_MAX_WAIT_MS", "10"))
+MAX_QUEUE = int(os.getenv("SENTIMENT_MAX_QUEUE", "256"))
+
 # ─────────────────────────────────────────────────────────────────────────────
 # AutoTokenizer:
 # - Converts raw human-readable text into model-readable inputs (tokens).
@@ -39,10 +49,8 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # - https://huggingface.co/cardiffnlp/twitter-roberta-base-sentiment
 # ─────────────────────────────────────────────────────────────────────────────
 
-# --- Load Pretrained Model & Tokenizer ---
-MODEL_NAME = "cardiffnlp/twitter-roberta-base-sentiment"
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, force_download=True)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+# --- Pretrained Model & Tokenizer ---
+# Loaded once per process by backend/model_registry.py on first use and shared by every Streamlit session
 
 # --- Preprocessing Text ---
 def preprocess(text):
@@ -50,26 +58,202 @@ def preprocess(text):
     text = re.sub(r"http\S+","",text)   #remove URLs | substitute the pattern match i.e. URLs with empty 
     return text.strip()
 
+
+# --- Class probabilities of tokenized windows (special tokens included), right-padded to the longest one in one batch ---
+def _forward(windows, backend=None):
+    tokenizer, model = get_sentiment_model(backend)
+    longest = max(len(w) for w in windows)
+    input_ids = torch.full((len(windows), longest), tokenizer.pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(windows), longest), dtype=torch.long)
+    for row, window in enumerate(windows):
+        input_ids[row, :len(window)] = torch.tensor(window, dtype=torch.long)
+        attention_mask[row, :len(window)] = 1
+    with torch.no_grad(): #Since we are not training the model, no_grad is used to stop PyTorch from tracking gradients
+        return torch.nn.functional.softmax(model(input_ids=input_ids, attention_mask=attention_mask).logits, dim=-1)
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(backend=None):
+    """
+    Returns the shared MicroBatchScheduler of a backend, whose worker thread runs every sentiment batch of the process.
+    """
+    backend = backend or DEFAULT_BACKEND
+    with _schedulers_lock:
+        if backend not in _schedulers:
+            _schedulers[backend] = MicroBatchScheduler(lambda windows: list(_forward(windows, backend)), max_batch=MAX_BATCH,
+                                                       max_wait_ms=MAX_WAIT_MS, max_queue=MAX_QUEUE, name=f"sentiment_{backend}")
+    return _schedulers[backend]
+
+
+# --- Probabilities of tokenized windows, one row each | through the scheduler, so concurrent callers share batches ---
+def _infer(windows, backend=None):
+    if SCHEDULER:
+        return torch.stack(get_scheduler(backend).infer(windows))
+    return _forward(windows, backend)
+
 # --- Sentiment Analysis Model ---
-def analyze_sentiment(text):
+@instrument("sentiment")
+def analyze_sentiment(text, backend=None):
     """
     Returns the sentiment label and confidence score for the given text.
+    backend selects the inference backend ("fp32", "int8" or "onnx", see backend/model_registry.py).
     """
     #Preprocess text to remove URLs and Emojis
     text = preprocess(text) 
-    #Return_tensors="pt" means to return the tokens in PyTorch tensor format | truncation=True tells the tokenizer to truncate the text if it's too long for the model (max = 512 tokens)
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-
+    tokenizer, _ = get_sentiment_model(backend)
+    #truncation=True tells the tokenizer to truncate the text if it's too long for the model (max = 512 tokens)
+    input_ids = tokenizer(text, truncation=True, max_length=512)["input_ids"]
 
-    with torch.no_grad(): #Since we are not training the model, no_grad is used to stop PyTorch from tracking gradients
-        #Pass the tokenized input to the RoBERTa model
-        # - **input unpacks the dictionary into keyword arguments (input_ids, attention_mask)
-        # - .logits gives the raw scores (logits) for each class from the output layer
-        logits = model(**inputs).logits 
-
-    probs = torch.nn.functional.softmax(logits, dim=-1) #Apply softmax to convert logits into probabilities 
+    #The RoBERTa model gives raw scores (logits) for each class, softmax converts them into probabilities
+    #The request is queued and batched with those of other sessions by the scheduler
+    probs = _infer([input_ids], backend)
     predicted_class = torch.argmax(probs).item()    #Finds the index of the class with the highest probability, which corresponds to the sentiment the model has identfied
     sentiment_labels = ['Negative', 'Neutral', 'Positive']
     sentiment = sentiment_labels[predicted_class]
     confidence = probs[0][predicted_class].item()   #Confidence score of the predicted class
-    return sentiment, round(confidence, 3)  #Return the sentiment and the confidence score
\ No newline at end of file
+    return sentiment, round(confidence, 3)  #Return the sentiment and the confidence score
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# analyze_sentiment_windows()
+# Purpose: Judge the mood of a full-length transcript instead of only its first 512 tokens
+# Parameters:
+#   - text (str): Full meeting transcript
+#   - window_size (int): Tokens per window, including the <s> and </s> special tokens (max = 512)
+#   - stride (int): Tokens shared between two neighbouring windows, so a sentence cut at a window edge is still seen whole once
+#   - batch_size (int): Number of windows this call submits at a time. With the scheduler on, the model's padded batch is
+#     formed from the windows of every caller and holds up to SENTIMENT_MAX_BATCH of them
+#   - backend (str): Inference backend, "fp32", "int8" or "onnx" (defaults to SENTIMENT_BACKEND)
+# Returns:
+#   - dict: {"sentiment", "confidence", "timeline", "windows", "seconds", "windows_per_sec"}
+#     where timeline is a list of {"index", "start_char", "end_char", "sentiment", "confidence"} in transcript order
+# ─────────────────────────────────────────────────────────────────────────────
+@instrument("sentiment")
+def analyze_sentiment_windows(text, window_size=512, stride=64, batch_size=8, backend=None):
+    sentiment_labels = ['Negative', 'Neutral', 'Positive']
+    text = preprocess(text)
+    tokenizer, _ = get_sentiment_model(backend)
+    started = time.perf_counter()
+
+    #Tokenize once without special tokens and without truncation | offsets map every token back to its character span in the transcript
+    encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+    ids = encoded["input_ids"]
+    offsets = encoded["offset_mapping"]
+
+    body = window_size - 2     #Room left for transcript tokens once <s> and </s> are added
+    step = max(body - stride, 1)
+    starts = list(range(0, max(len(ids) - stride, 1), step)) or [0]
+
+    total_probs = torch.zeros(len(sentiment_labels))
+    total_weight = 0
+    timeline = []
+
+    #Only batch_size windows of this transcript are in flight at a time, so memory does not grow with its length. The model's
+    #peak memory is set by its largest batch: SENTIMENT_MAX_BATCH windows merged from all callers with the scheduler on,
+    #batch_size without it
+    for batch_start in range(0, len(starts), batch_size):
+        #<s> window </s> built by hand: build_inputs_with_special_tokens() is gone from the tokenizers of transformers 5
+        batch_ids = [
+            [tokenizer.cls_token_id] + ids[s:s + body] + [tokenizer.sep_token_id]
+            for s in starts[batch_start:batch_start + batch_size]
+        ]
+        probs = _infer(batch_ids, backend)
+
+        for row, s in enumerate(starts[batch_start:batch_start + batch_size]):
+            window_tokens = max(min(body, len(ids) - s), 1)
+            predicted_class = torch.argmax(probs[row]).item()
+            #Longer windows carry more of the meeting, so they weigh more in the overall mood
+            total_probs += probs[row] * window_tokens
+            total_weight += window_tokens
+            timeline.append({
+                "index": len(timeline),
+                "start_char": offsets[s][0] if ids else 0,
+                "end_char": offsets[min(s + window_tokens, len(ids)) - 1][1] if ids else 0,
+                "sentiment": sentiment_labels[predicted_class],
+                "confidence": round(probs[row][predicted_class].item(), 3),
+            })
+
+    overall = total_probs / max(total_weight, 1)
+    predicted_class = torch.argmax(overall).item()
+    seconds = time.perf_counter() - started
+    incr("sentiment_windows_total", len(timeline))
+    set_attribute(tokens=len(ids), windows=len(timeline), inference_seconds=round(seconds, 3))
+    return {
+        "sentiment": sentiment_labels[predicted_class],
+        "confidence": round(overall[predicted_class].item(), 3),
+        "timeline": timeline,
+        "windows": len(timeline),
+        "seconds": round(seconds, 3),
+        "windows_per_sec": round(len(timeline) / seconds, 2) if seconds else 0.0,  #Throughput on the current device (CPU for brieFly)
+    }
+
+
+# --- Class probabilities of many short texts in padded batches | sorted by length first, so each batch needs little padding ---
+def _batch_probs(texts, batch_size=32, backend=None):
+    tokenizer, _ = get_sentiment_model(backend)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    probs = torch.zeros((len(texts), 3))
+    for batch_start in range(0, len(order), batch_size):
+        rows = order[batch_start:batch_start + batch_size]
+        windows = tokenizer([preprocess(texts[i]) for i in rows], truncation=True, max_length=512)["input_ids"]
+        probs[rows] = _infer(windows, backend)
+    return probs
+
+
+def analyze_sentiment_batch(texts, batch_size=32, backend=None):
+    """
+    Returns a (sentiment, confidence) pair for every text, like analyze_sentiment() but in padded batches.
+    Each text is truncated to 512 tokens, so this is meant for sentences and transcript cues, not whole meetings.
+    """
+    sentiment_labels = ['Negative', 'Neutral', 'Positive']
+    probs = _batch_probs(texts, batch_size, backend) if texts else torch.zeros((0, 3))
+    return [(sentiment_labels[row.argmax().item()], round(row.max().item(), 3)) for row in probs]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# analyze_segments_sentiment()
+# Purpose: Mood per speaker and per time slice of a transcript that comes with speakers and timestamps (e.g. a .vtt)
+# - Every segment is scored once in padded batches, then the probabilities are averaged per speaker and per slice,
+#   weighted by segment length
+# Parameters:
+#   - segments (list[dict]): {"start", "end", "speaker", "text"} as returned by backend/text_ingest.py
+#   - slice_seconds (int): Length of a time slice. Segments without a timestamp only count towards their speaker
+#   - batch_size (int): Segments sent through the model in one padded batch
+#   - backend (str): Inference backend, "fp32", "int8" or "onnx" (defaults to SENTIMENT_BACKEND)
+# Returns:
+#   - dict: {"speakers": {name: {"sentiment", "confidence", "segments"}}, "slices": [{"start", "end", "sentiment",
+#     "confidence", "segments"}], "segments", "seconds", "segments_per_sec"}. Segments without a speaker are under "Unknown"
+# ─────────────────────────────────────────────────────────────────────────────
+@instrument("speaker_sentiment")
+def analyze_segments_sentiment(segments, slice_seconds=60, batch_size=32, backend=None):
+    sentiment_labels = ['Negative', 'Neutral', 'Positive']
+    segments = [seg for seg in segments if seg["text"].strip()]
+    started = time.perf_counter()
+    probs = _batch_probs([seg["text"] for seg in segments], batch_size, backend) if segments else torch.zeros((0, 3))
+    weights = [len(seg["text"]) for seg in segments]   #Longer segments carry more of the meeting
+
+    def aggregate(rows):
+        total = sum((probs[i] * weights[i] for i in rows), torch.zeros(len(sentiment_labels)))
+        overall = total / max(sum(weights[i] for i in rows), 1)
+        predicted_class = torch.argmax(overall).item()
+        return {"sentiment": sentiment_labels[predicted_class], "confidence": round(overall[predicted_class].item(), 3), "segments": len(rows)}
+
+    by_speaker, by_slice = {}, {}
+    for i, seg in enumerate(segments):
+        by_speaker.setdefault(seg.get("speaker") or "Unknown", []).append(i)
+        if seg.get("start") is not None:
+            by_slice.setdefault(int(seg["start"] // slice_seconds), []).append(i)
+
+    seconds = time.perf_counter() - started
+    set_attribute(segments=len(segments), inference_seconds=round(seconds, 3))
+    return {
+        "speakers": {speaker: aggregate(rows) for speaker, rows in by_speaker.items()},
+        "slices": [{"start": index * slice_seconds, "end": (index + 1) * slice_seconds, **aggregate(by_slice[index])}
+                   for index in sorted(by_slice)],
+        "segments": len(segments),
+        "seconds": round(seconds, 3),
+        "segments_per_sec": round(len(segments) / seconds, 2) if seconds else 0.0,
+    }
@@ -0,0 +1,87 @@
+import argparse
+import glob
+import json
+import re
+import time
+from backend.model_registry import BACKENDS, get_sentiment_model, load_stats
+from backend.sentiment_analysis import analyze_sentiment
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Sentiment backend parity & speed check
+# - Runs the same texts through every inference backend (fp32, int8, onnx)
+# - Parity: label agreement with fp32 and the largest confidence difference
+# - Speed: model load time, mean / p95 latency per text and throughput in texts per second
+#
+# Usage (from the repo root):
+#   python -m backend.sentiment_benchmark --backends fp32 int8 onnx --threads 4
+# By default the texts are the sentences of the transcripts saved in outputs/
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_texts(pattern="outputs/*_transcript.txt", limit=200):
+    texts = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding="utf-8") as f:
+            #Group sentences in threes so every text is a few lines long, like a short stretch of a meeting
+            sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", f.read()) if s.strip()]
+        texts.extend(" ".join(sentences[i:i + 3]) for i in range(0, len(sentences), 3))
+    return texts[:limit]
+
+
+def _run(texts, backend):
+    get_sentiment_model(backend)    #Load outside of the timed loop
+    latencies, results = [], []
+    started = time.perf_counter()
+    for text in texts:
+        t = time.perf_counter()
+        results.append(analyze_sentiment(text, backend=backend))
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - started
+    latencies.sort()
+    return results, {
+        "load_seconds": load_stats(backend).get("load_seconds"),
+        "rss_after_load_mb": load_stats(backend).get("rss_after_mb"),
+        "mean_latency_ms": round(1000 * total / len(texts), 2),
+        "p95_latency_ms": round(1000 * latencies[int(0.95 * (len(latencies) - 1))], 2),
+        "texts_per_sec": round(len(texts) / total, 2),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# compare_backends()
+# Purpose: Parity and latency/throughput comparison of backends against fp32
+# Parameters:
+#   - texts (list[str]): Texts to classify
+#   - backends (iterable[str]): Backends to compare (fp32 is always run as the reference)
+# Returns:
+#   - dict: backend -> {label_agreement, max_confidence_diff, mean_latency_ms, p95_latency_ms, texts_per_sec, ...}
+# ─────────────────────────────────────────────────────────────────────────────
+def compare_backends(texts, backends=BACKENDS):
+    if not texts:
+        raise ValueError("No texts to benchmark.")
+    reference, report = None, {}
+    for backend in ["fp32"] + [b for b in backends if b != "fp32"]:
+        results, timings = _run(texts, backend)
+        if reference is None:
+            reference = results
+        agree = sum(r[0] == ref[0] for r, ref in zip(results, reference))
+        report[backend] = {
+            "label_agreement": round(agree / len(texts), 4),
+            "max_confidence_diff": round(max(abs(r[1] - ref[1]) for r, ref in zip(results, reference)), 3),
+            **timings,
+            "speedup_vs_fp32": round(timings["texts_per_sec"] / report["fp32"]["texts_per_sec"], 2) if report else 1.0,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sentiment inference backends against fp32.")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--threads", type=int, help="CPU threads per backend (sets SENTIMENT_THREADS)")
+    parser.add_argument("--texts", default="outputs/*_transcript.txt", help="Glob of transcript files to sample")
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.threads:
+        import os
+        os.environ["SENTIMENT_THREADS"] = str(args.threads)
+    print(json.dumps(compare_backends(load_texts(args.texts, args.limit), args.backends), indent=2))
@@ -0,0 +1,158 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+from backend.instrumentation import incr
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Micro-batching inference scheduler
+# - Sentiment requests from every Streamlit session, job and pipeline thread go into one bounded queue
+# - A single worker thread owns the model: it takes the first waiting request, keeps collecting requests for up to
+#   max_wait_ms (or until max_batch are waiting) and runs them as one padded batch. Under load many small calls become
+#   a few full batches, and the model is never called from several threads at once
+# - Each caller gets a Future with its own rows back. Every future of a batch is resolved, with the batch's exception
+#   when run_batch fails or returns the wrong number of rows, and infer() gives up after result_timeout seconds
+# - Backpressure: when max_queue requests are already waiting, submit() blocks up to submit_timeout seconds and then
+#   raises, instead of letting the queue (and latency) grow without bound
+# - stats() and the instrumentation counters report batch sizes, queue wait and throughput
+# ─────────────────────────────────────────────────────────────────────────────
+
+class MicroBatchScheduler:
+    """
+    Coalesces single inference requests into batches run on a dedicated worker thread.
+    Args:
+        run_batch (callable): Called on the worker with a list of items, returns one result per item in the same order.
+        max_batch (int): Largest batch handed to run_batch.
+        max_wait_ms (float): How long the worker waits for more requests once it has the first one.
+        max_queue (int): Requests allowed to wait at the same time.
+        submit_timeout (float): Seconds submit() blocks on a full queue before raising RuntimeError.
+        result_timeout (float): Seconds infer() waits for its results before raising RuntimeError.
+        name (str): Used for the worker thread and the metric labels.
+    """
+    def __init__(self, run_batch, max_batch=32, max_wait_ms=10, max_queue=256, submit_timeout=30, result_timeout=120,
+                 name="scheduler"):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.submit_timeout = submit_timeout
+        self.result_timeout = result_timeout
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._stats = {"requests": 0, "batches": 0, "rejected": 0, "max_batch_size": 0, "queue_wait_seconds": 0.0,
+                       "max_queue_wait_seconds": 0.0, "busy_seconds": 0.0}
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name=f"{self.name}-worker", daemon=True)
+                self._worker.start()
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # submit()
+    # Returns:
+    #   - Future: Resolves to run_batch()'s result for this item, or raises its exception
+    # Raises:
+    #   - RuntimeError: if the queue stays full for submit_timeout seconds
+    # ─────────────────────────────────────────────────────────────────────────
+    def submit(self, item):
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put((item, future, time.perf_counter()), timeout=self.submit_timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            incr("scheduler_rejected_total", scheduler=self.name)
+            raise RuntimeError(f"The {self.name} queue is full, try again in a moment.")
+        return future
+
+    def infer(self, items, timeout=None):
+        """
+        Submits every item and waits for all of them, at most timeout seconds in total (defaults to result_timeout).
+        Returns the results in item order. Raises RuntimeError on timeout or a full queue, the items not started yet are
+        dropped.
+        """
+        futures = []
+        try:
+            for item in items:
+                futures.append(self.submit(item))
+        except RuntimeError:    #Queue full part way: the items already queued would be computed for nobody
+            self._cancel(futures)
+            raise
+        deadline = time.perf_counter() + (self.result_timeout if timeout is None else timeout)
+        try:
+            return [future.result(timeout=max(deadline - time.perf_counter(), 0)) for future in futures]
+        except TimeoutError:
+            self._cancel(futures)
+            raise RuntimeError(f"The {self.name} results did not arrive in time, try again in a moment.")
+
+    @staticmethod
+    def _cancel(futures):
+        for future in futures:
+            future.cancel()     #Still queued: the worker skips it
+
+    # --- Next batch: blocks for the first request, then collects more until max_batch or max_wait runs out ---
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._run(batch)
+            except Exception as e:  #One failed batch fails its callers, the worker keeps serving the next ones
+                for _, future, _ in batch:
+                    if not future.done():
+                        try:
+                            future.set_exception(e)
+                        except InvalidStateError:   #Cancelled by its caller in the meantime
+                            pass
+
+    def _run(self, batch):
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]  #Skips requests whose caller gave up
+        if not batch:
+            return
+        started = time.perf_counter()
+        waits = [started - queued_at for _, _, queued_at in batch]
+        results = list(self.run_batch([item for item, _, _ in batch]))
+        if len(results) != len(batch):  #Rows can't be matched to callers any more: fail the whole batch
+            raise RuntimeError(f"{self.name} returned {len(results)} results for a batch of {len(batch)}")
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+        busy = time.perf_counter() - started
+
+        with self._lock:
+            stats = self._stats
+            stats["requests"] += len(batch)
+            stats["batches"] += 1
+            stats["max_batch_size"] = max(stats["max_batch_size"], len(batch))
+            stats["queue_wait_seconds"] += sum(waits)
+            stats["max_queue_wait_seconds"] = max(stats["max_queue_wait_seconds"], max(waits))
+            stats["busy_seconds"] += busy
+        incr("scheduler_batches_total", scheduler=self.name)
+        incr("scheduler_requests_total", len(batch), scheduler=self.name)
+        incr("scheduler_queue_wait_seconds_total", round(sum(waits), 6), scheduler=self.name)
+        incr("scheduler_busy_seconds_total", round(busy, 6), scheduler=self.name)
+
+    def stats(self):
+        """
+        Returns request and batch counts, mean / max batch size, mean / max queue wait, queue depth and throughput
+        (requests per second of model time).
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mean_batch_size"] = round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["mean_queue_wait_ms"] = round(1000 * stats["queue_wait_seconds"] / stats["requests"], 2) if stats["requests"] else 0.0
+        stats["requests_per_sec"] = round(stats["requests"] / stats["busy_seconds"], 2) if stats["busy_seconds"] else 0.0
+        return stats
@@ -1,11 +1,81 @@
 import openai
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from backend.instrumentation import in_current_context, incr, instrument, instrument_stream, span
+from backend.llm_cache import get_cache, make_key
 
 # Load environment variables from .env file
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
+MODEL = "gpt-4o"
+#Bump a template's version whenever its prompt text changes, so cached responses of the old prompt are not reused
+PROMPT_VERSIONS = {"summary": "1", "summary_chunk": "1", "summary_reduce": "1", "suggestions": "1"}
+
+#Transcripts longer than this are summarized map-reduce style, in chunks of CHUNK_TOKENS (see summarize_actions_map_reduce)
+SINGLE_CALL_MAX_TOKENS = int(os.getenv("SUMMARY_SINGLE_CALL_MAX_TOKENS", "12000"))
+CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "4000"))
+MAX_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+
+try:
+    import tiktoken     #Optional: exact token counts. Without it, tokens are estimated as ~4 characters each
+    _encoding = tiktoken.get_encoding("o200k_base")     #Tokenizer used by gpt-4o
+except Exception:
+    _encoding = None
+
+
+# --- Token counting ---
+def count_tokens(text:str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# split_transcript()
+# Purpose: Splits a transcript into chunks of at most max_tokens, cutting between sentences where it can
+# - Raw speech-to-text output often has no sentence punctuation at all: a "sentence" over max_tokens is cut
+#   between words instead, so no chunk goes over the budget
+# Parameters:
+#   - transcript (str): Full meeting transcript
+#   - max_tokens (int): Token budget per chunk
+# Returns:
+#   - list[str]: Chunks in transcript order
+# ─────────────────────────────────────────────────────────────────────────────
+def split_transcript(transcript:str, max_tokens:int=CHUNK_TOKENS) -> list:
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", transcript.strip()) if s]
+    chunks, current, current_tokens = [], [], 0
+    for sentence in sentences:
+        tokens = count_tokens(sentence)
+        pieces = [(sentence, tokens)] if tokens <= max_tokens else _split_words(sentence, max_tokens)
+        for piece, piece_tokens in pieces:
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+# --- Cuts text over max_tokens between words | returns [(piece, tokens), ...] ---
+def _split_words(text:str, max_tokens:int) -> list:
+    pieces, current, current_tokens = [], [], 0
+    for word in text.split():
+        tokens = count_tokens(word)     #Counted per word, which overestimates: pieces stay under the budget
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+        current.append(word)    #Only a single word longer than max_tokens can still exceed it
+        current_tokens += tokens
+    if current:
+        pieces.append((" ".join(current), current_tokens))
+    return pieces
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # summarize_actions()
@@ -15,7 +85,20 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 # Returns:
 #   - str: Combined summary and action items in readable format
 # ─────────────────────────────────────────────────────────────────────────────
+@instrument("summary")
 def summarize_actions(transcript:str) -> str:   #transcript:str is a type hint, indicating that transcript will be of type hint | -> str indicates the return type will be a string
+    #Long meetings would blow the context window (or be slow and costly in one request), so they go through map-reduce
+    if count_tokens(transcript) > SINGLE_CALL_MAX_TOKENS:
+        return summarize_actions_map_reduce(transcript)
+
+    try:
+        return _complete(**_summary_request(transcript))
+    except Exception as e:
+        return f"❌ Something went wrong {str(e)}"
+
+
+# --- Prompt of the single-call summary, as keyword arguments of _complete() / _complete_stream() ---
+def _summary_request(transcript:str) -> dict:
     #A formatted string literal supporting multiple lines. \"\"\" indicates to the model that it is the start of the transcript
     prompt = f"""   
     You are an expert office meeting assistant. Given the transcript of a meeting, extract:
@@ -28,20 +111,210 @@ def summarize_actions(transcript:str) -> str:   #transcript:str is a type hint,
     \"\"\"
     Return both the summary and the action items clearly formatted.
     """ 
-    try:
+    #Temperature controls randomness of model (lower = focused, higher = more creative) | Since we need data from the existing transcription and no extra creativity is needed, we are keeping this value low
+    return {"prompt": prompt, "temperature": 0.3, "template": "summary", "inputs": {"transcript": transcript}}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# _complete()
+# Purpose: One gpt-4o chat completion, answered from the response cache when the same request was made before
+# Parameters:
+#   - prompt (str): User prompt
+#   - temperature (float): Sampling temperature
+#   - template (str): Prompt template name, a key of PROMPT_VERSIONS
+#   - inputs (dict): Values filled into the template, hashed into the cache key
+#   - system (str): System prompt, sets assistant behavior
+# Returns:
+#   - str: Completion text
+# ─────────────────────────────────────────────────────────────────────────────
+def _complete(prompt:str, temperature:float, template:str, inputs:dict, system:str="You are an efficient and clear AI work assistant.") -> str:
+    cache = get_cache()
+    key = make_key(MODEL, temperature, template, PROMPT_VERSIONS[template], {**inputs, "system": system}) if cache else None
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            incr("llm_cache_hits_total", template=template)
+            return cached
+
+    with span("openai_chat", template=template, request_bytes=len(prompt.encode("utf-8")) + len(system.encode("utf-8"))):
         response = openai.chat.completions.create(
-            model="gpt-4o",
+            model=MODEL,
+            messages=[
+                {"role":"system", "content":system},
+                {"role":"user","content":prompt}
+            ],
+            temperature = temperature
+        )
+        _record_usage(template, response.usage)
+    text = response.choices[0].message.content.strip()
+    if cache:   #Only successful completions reach this point, errors are never cached
+        cache.put(key, text, response.usage.total_tokens if response.usage else 0)
+    return text
+
+
+# --- Request and token counters of one completion (usage is None if the API did not report it) ---
+def _record_usage(template:str, usage) -> None:
+    incr("openai_requests_total", template=template)
+    if usage:
+        incr("openai_tokens_total", usage.prompt_tokens, kind="prompt", template=template)
+        incr("openai_tokens_total", usage.completion_tokens, kind="completion", template=template)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# _complete_stream()
+# Purpose: Streaming version of _complete(): yields the completion text chunk by chunk as gpt-4o produces it
+# Parameters:
+#   - same as _complete(), plus:
+#   - metrics (dict): Filled in place with time_to_first_token, total_seconds, total_tokens and cached
+#   - started (float): time.perf_counter() the timings count from (defaults to now)
+# Yields:
+#   - str: Text chunks. A cached response is yielded as a single chunk
+# ─────────────────────────────────────────────────────────────────────────────
+def _complete_stream(prompt:str, temperature:float, template:str, inputs:dict, system:str="You are an efficient and clear AI work assistant.",
+                     metrics:dict=None, started:float=None):
+    metrics = metrics if metrics is not None else {}
+    started = started or time.perf_counter()
+    cache = get_cache()
+    key = make_key(MODEL, temperature, template, PROMPT_VERSIONS[template], {**inputs, "system": system}) if cache else None
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            incr("llm_cache_hits_total", template=template)
+            elapsed = round(time.perf_counter() - started, 3)
+            metrics.update(time_to_first_token=elapsed, total_seconds=elapsed, total_tokens=0, cached=True)
+            yield cached
+            return
+
+    with span("openai_chat", template=template, streamed=True,
+              request_bytes=len(prompt.encode("utf-8")) + len(system.encode("utf-8"))) as record:
+        stream = openai.chat.completions.create(
+            model=MODEL,
             messages=[
-                {"role":"system", "content":"You are an efficient and clear AI work assistant."},   #Sets assistant behavior
-                {"role":"user","content":prompt}                                                    #Sets task for prompt
+                {"role":"system", "content":system},
+                {"role":"user","content":prompt}
             ],
-            temperature = 0.3   #Controls randomness of model (lower = focused, higher = more creative) | Since we need data from the existing transcription and no extra creativity is needed, we are keeping this value low
+            temperature = temperature,
+            stream = True,
+            stream_options = {"include_usage": True}    #The last chunk carries the token usage
         )
-        return response.choices[0].message.content.strip()
+        parts, tokens, usage = [], 0, None
+        try:
+            for chunk in stream:
+                if chunk.usage:
+                    usage = chunk.usage
+                    tokens = chunk.usage.total_tokens
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not parts:
+                        metrics["time_to_first_token"] = round(time.perf_counter() - started, 3)
+                        record["attributes"]["time_to_first_token"] = metrics["time_to_first_token"]
+                    parts.append(delta)
+                    yield delta
+        finally:
+            stream.close()  #Also when the consumer stops early (generator closed): dropping the connection ends the generation
+        _record_usage(template, usage)
+    text = "".join(parts).strip()
+    metrics.update(total_seconds=round(time.perf_counter() - started, 3), total_tokens=tokens, cached=False)
+    if cache and text:
+        cache.put(key, text, tokens)
+
+
+# --- Map step: summary and action items of one part of the meeting ---
+def _summarize_chunk(chunk:str, index:int, total:int) -> str:
+    prompt = f"""
+    You are an expert office meeting assistant. Below is part {index} of {total} of a meeting transcript. Extract:
+    1. A short summary of this part.
+    2. A list of the action items mentioned in this part (owner and deadline when stated).
+
+    Transcript part:
+    \"\"\"
+    {chunk}
+    \"\"\"
+    """
+    return _complete(prompt, 0.3, "summary_chunk", {"chunk": chunk, "index": index, "total": total})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# summarize_actions_map_reduce()
+# Purpose: Summary and action items for transcripts that exceed the single-prompt token budget
+# - Map: the transcript is split on sentence boundaries into CHUNK_TOKENS chunks, summarized concurrently
+# - Reduce: one more call merges the partial summaries and removes duplicate action items. When the partial summaries
+#   of a very long meeting are themselves over SINGLE_CALL_MAX_TOKENS, they are first merged group by group, as many
+#   rounds as needed (see _collapse_notes)
+# Parameters:
+#   - transcript (str): Full meeting transcript
+#   - chunk_tokens (int): Token budget per chunk
+#   - max_workers (int): Chunks summarized at the same time
+# Returns:
+#   - str: Combined summary and action items in readable format
+# ─────────────────────────────────────────────────────────────────────────────
+def summarize_actions_map_reduce(transcript:str, chunk_tokens:int=CHUNK_TOKENS, max_workers:int=MAX_WORKERS) -> str:
+    try:
+        return _complete(**_reduce_request(_map_notes(transcript, chunk_tokens, max_workers)))
     except Exception as e:
         return f"❌ Something went wrong {str(e)}"
 
 
+# --- Map step over all chunks, concurrently | returns the partial notes labelled in transcript order ---
+def _map_notes(transcript:str, chunk_tokens:int=CHUNK_TOKENS, max_workers:int=MAX_WORKERS) -> str:
+    chunks = split_transcript(transcript, chunk_tokens)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        partials = list(pool.map(in_current_context(lambda args: _summarize_chunk(*args)),
+                                 [(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]))  #map() keeps the chunk order
+    return _collapse_notes(partials, max_workers)
+
+
+def _label(partials:list) -> str:
+    return "\n\n".join(f"Part {i + 1}:\n{partial}" for i, partial in enumerate(partials))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# _collapse_notes()
+# Purpose: Recursive reduce step, so the final merge prompt always fits the single-call budget
+# - While the labelled notes are over SINGLE_CALL_MAX_TOKENS, consecutive partials are packed into groups that fit it
+#   (at least two per group, so every round shrinks the list) and each group is merged with the reduce prompt
+# Parameters:
+#   - partials (list[str]): Map step outputs in transcript order
+#   - max_workers (int): Groups merged at the same time
+# Returns:
+#   - str: Labelled notes for the final reduce call
+# ─────────────────────────────────────────────────────────────────────────────
+def _collapse_notes(partials:list, max_workers:int=MAX_WORKERS) -> str:
+    notes = _label(partials)
+    while len(partials) > 1 and count_tokens(notes) > SINGLE_CALL_MAX_TOKENS:
+        groups, current, current_tokens = [], [], 0
+        for partial in partials:
+            tokens = count_tokens(partial)
+            if len(current) >= 2 and current_tokens + tokens > SINGLE_CALL_MAX_TOKENS:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(partial)
+            current_tokens += tokens
+        groups.append(current)
+        incr("summary_reduce_rounds_total")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            partials = list(pool.map(in_current_context(
+                lambda group: group[0] if len(group) == 1 else _complete(**_reduce_request(_label(group)))), groups))
+        notes = _label(partials)
+    return notes
+
+
+# --- Reduce step prompt, as keyword arguments of _complete() / _complete_stream() ---
+def _reduce_request(notes:str) -> dict:
+    prompt = f"""
+    You are an expert office meeting assistant. The notes below were taken from consecutive parts of one meeting. Combine them into:
+    1. A short meeting summary covering the whole meeting.
+    2. A single list of action items. Merge items that describe the same task and drop exact or near duplicates.
+
+    Notes:
+    \"\"\"
+    {notes}
+    \"\"\"
+    Return both the summary and the action items clearly formatted.
+    """
+    return {"prompt": prompt, "temperature": 0.3, "template": "summary_reduce", "inputs": {"notes": notes}}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # generate_suggestions()
 # Purpose: Suggest team management tips based on sentiment and meeting content
@@ -51,7 +324,16 @@ def summarize_actions(transcript:str) -> str:   #transcript:str is a type hint,
 # Returns:
 #   - str: Actionable, concise suggestions for team managers
 # ─────────────────────────────────────────────────────────────────────────────
+@instrument("suggestions")
 def generate_suggestions(transcript_text:str, sentiment:str) -> str:
+    try:
+        return _complete(**_suggestions_request(transcript_text, sentiment))
+    except Exception as e:
+        return f"❌ Somthing went wrong {str(e)}"
+
+
+# --- Prompt of the manager suggestions, as keyword arguments of _complete() / _complete_stream() ---
+def _suggestions_request(transcript_text:str, sentiment:str) -> dict:
     prompt = f"""
     You are an expert HR assistant. Given the following meeting transcript and its detected sentiment, generate:
 
@@ -78,15 +360,53 @@ def generate_suggestions(transcript_text:str, sentiment:str) -> str:
     - <suggestion 2>
     - <suggestion 3>
     """
+    return {"prompt": prompt, "temperature": 0.5, "template": "suggestions",
+            "inputs": {"transcript": transcript_text, "sentiment": sentiment},
+            "system": "You are an efficient and clear work assistant."}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# summarize_actions_stream() / generate_suggestions_stream()
+# Purpose: Streaming variants of summarize_actions() and generate_suggestions()
+# - Yield the text as the model produces it, so the UI can render it progressively
+# - Long transcripts still go through map-reduce: the map step runs first, then the final merge is streamed
+# Parameters:
+#   - same as the non-streaming functions, plus:
+#   - metrics (dict): Filled in place with time_to_first_token and total_seconds (both measured from the call),
+#     total_tokens and cached
+# Yields:
+#   - str: Text chunks, or a single error message chunk if the request fails before any text was sent
+# Raises:
+#   - Exception: the request's error when it fails after some text was sent. An error message appended there would read
+#     as part of the text, so the caller has to drop the partial text instead
+# ─────────────────────────────────────────────────────────────────────────────
+@instrument_stream("summary")
+def summarize_actions_stream(transcript:str, metrics:dict=None):
+    started = time.perf_counter()
+    sent = False
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role":"system","content":"You are an efficient and clear work assistant."},
-                {"role":"user","content":prompt}
-            ],
-            temperature=0.5
-        )
-        return response.choices[0].message.content.strip()
+        if count_tokens(transcript) > SINGLE_CALL_MAX_TOKENS:
+            request = _reduce_request(_map_notes(transcript))
+        else:
+            request = _summary_request(transcript)
+        for chunk in _complete_stream(**request, metrics=metrics, started=started):
+            sent = True
+            yield chunk
     except Exception as e:
-        return f"❌ Somthing went wrong {str(e)}"
+        if sent:
+            raise
+        yield f"❌ Something went wrong {str(e)}"
+
+
+@instrument_stream("suggestions")
+def generate_suggestions_stream(transcript_text:str, sentiment:str, metrics:dict=None):
+    sent = False
+    try:
+        for chunk in _complete_stream(**_suggestions_request(transcript_text, sentiment), metrics=metrics):
+            sent = True
+            yield chunk
+    except Exception as e:
+        if sent:
+            raise
+        yield f"❌ Somthing went wrong {str(e)}"
+
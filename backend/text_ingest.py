@@ -0,0 +1,172 @@
+import html
+import os
+import re
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Text transcript ingestion
+# - .vtt (WebVTT, e.g. Zoom's audio transcript) and .txt uploads are already text: they are parsed here instead of
+#   being sent to Whisper, which saves the upload round trip and works without an API key
+# - The WebVTT parser streams the file line by line, so memory stays flat for very long meetings
+# - Speakers come from <v Name> voice tags or a "Name: " prefix (Zoom's style). Timestamps are kept in seconds
+# - read_transcript() returns the same {"text", "segments"} structure as the transcription engines, with a speaker on
+#   every segment
+# ─────────────────────────────────────────────────────────────────────────────
+
+TEXT_EXTENSIONS = (".vtt", ".txt")
+
+_TIMING = re.compile(r"^((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s+-->\s+((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})")
+_VOICE = re.compile(r"<v(?:\.[^\s>]*)?\s+([^>]+)>")
+_TAG = re.compile(r"<[^>]*>")
+#"Name: text" with a short label before the colon, checked by _is_name()
+_SPEAKER_PREFIX = re.compile(r"^([^:!?]{1,40}?):\s+(.+)$")
+_NAME_PARTICLES = {"de", "da", "di", "del", "der", "van", "von", "la", "le", "du", "bin", "al"}
+#Plain text lines like "[00:01:02] Name: text" or "(01:02) Name: text". A bare "12:30 lunch" is text, not a timestamp
+_TXT_TIMESTAMP = re.compile(r"^[\[(]((?:\d+:)?\d{1,2}:\d{2}(?:[.,]\d{1,3})?)[\])]\s*(.*)$")
+
+
+def parse_timestamp(value):
+    """
+    Converts "hh:mm:ss.mmm", "mm:ss.mmm" (or with a comma, as in SRT) to seconds.
+    """
+    seconds = 0.0
+    for part in value.replace(",", ".").split(":"):
+        seconds = seconds * 60 + float(part)
+    return round(seconds, 3)
+
+
+# --- Name-like label: 1-4 words, each capitalized ("Alice", "Speaker 2", "Ana de Souza"), so "Note that X: Y" is text ---
+def _is_name(label):
+    words = label.split()
+    if not 1 <= len(words) <= 4 or not words[0][0].isupper():
+        return False
+    return all(w[0].isupper() or w.isdigit() or w in _NAME_PARTICLES for w in words) \
+        and not any("." in w[:-1] for w in words)     #A period only ends an abbreviation ("Dr. Lee"), never mid-word
+
+
+def _split_speaker(text):
+    match = _SPEAKER_PREFIX.match(text)
+    if match and _is_name(match.group(1)):
+        return match.group(1).strip(), match.group(2).strip()
+    return None, text
+
+
+def _cue(start, end, payload):
+    raw = " ".join(payload)
+    voice = _VOICE.search(raw)
+    text = html.unescape(_TAG.sub("", raw)).strip()     #Drops <v>, <c>, <b>, inline timestamps... then decodes &amp; etc.
+    speaker = voice.group(1).strip() if voice else None
+    if speaker is None:
+        speaker, text = _split_speaker(text)
+    return {"start": start, "end": end, "speaker": speaker, "text": text}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# parse_vtt()
+# Purpose: Streaming WebVTT cue parser
+# Parameters:
+#   - lines (iterable[str]): Lines of a .vtt file (an open file works)
+# Yields:
+#   - dict: {"start", "end", "speaker", "text"} per cue, in file order. speaker is None when the cue names nobody
+# ─────────────────────────────────────────────────────────────────────────────
+def parse_vtt(lines):
+    timing, payload, skipping = None, [], False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():    #A blank line ends the current block
+            if timing and payload:
+                cue = _cue(*timing, payload)
+                if cue["text"]:
+                    yield cue
+            timing, payload, skipping = None, [], False
+            continue
+        if skipping:
+            continue
+        if timing is None:
+            match = _TIMING.match(line.strip())
+            if match:
+                timing = (parse_timestamp(match.group(1)), parse_timestamp(match.group(2)))
+            elif line.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+                skipping = True     #Header and metadata blocks run until the next blank line
+            #Anything else before the timing line is a cue identifier, which is not needed
+        else:
+            payload.append(line.strip())
+    if timing and payload:  #Last cue when the file does not end with a blank line
+        cue = _cue(*timing, payload)
+        if cue["text"]:
+            yield cue
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# parse_txt()
+# Purpose: Line-based parser for plain text transcripts
+# - Every non-empty line is one segment. An optional leading "[hh:mm:ss]" timestamp and "Name:" prefix are picked up
+# - Cue timings ("00:01:02.000 --> 00:01:05.000") are also accepted, before the text or on a line of their own, in
+#   which case they apply to the next line
+# Yields:
+#   - dict: {"start", "end", "speaker", "text"}. start/end are None for lines without a timestamp, end is the next
+#     timestamped line's start
+# ─────────────────────────────────────────────────────────────────────────────
+def parse_txt(lines):
+    previous, pending = None, None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        start, end = pending or (None, None)
+        pending = None
+        timing = _TIMING.match(line)
+        match = None if timing else _TXT_TIMESTAMP.match(line)
+        if timing:
+            start, end = parse_timestamp(timing.group(1)), parse_timestamp(timing.group(2))
+            line = line[timing.end():].strip()
+            if not line:    #Timing on its own line
+                pending = (start, end)
+                continue
+        elif match:
+            start, line = parse_timestamp(match.group(1)), match.group(2)
+        speaker, text = _split_speaker(line)
+        if previous is not None:
+            if previous["end"] is None and start is not None and previous["start"] is not None:
+                previous["end"] = start
+            yield previous
+        previous = {"start": start, "end": end, "speaker": speaker, "text": text}
+    if previous is not None:
+        yield previous
+
+
+def is_text_transcript(path):
+    return os.path.splitext(path)[1].lower() in TEXT_EXTENSIONS
+
+
+def has_speaker_timeline(ingested):
+    """
+    True when a read_transcript() result names speakers or has timestamps, i.e. when the per-speaker / per-time-slice
+    mood (sentiment_analysis.analyze_segments_sentiment) has something to group by.
+    """
+    return bool(ingested["speakers"]) or any(seg["start"] is not None for seg in ingested["segments"])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# read_transcript()
+# Purpose: Reads a .vtt or .txt transcript file
+# Parameters:
+#   - path (str): Path to the file
+# Returns:
+#   - dict: {"text": str, "segments": [{"start", "end", "speaker", "text"}, ...], "speakers": [str, ...]}
+#     text puts consecutive cues of the same speaker in one "Name: ..." paragraph, which keeps the GPT prompt short
+# ─────────────────────────────────────────────────────────────────────────────
+def read_transcript(path):
+    parser = parse_vtt if path.lower().endswith(".vtt") else parse_txt
+    segments, paragraphs, speakers = [], [], {}
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        for segment in parser(f):
+            segments.append(segment)
+            speaker = segment["speaker"]
+            if speaker:
+                speakers.setdefault(speaker, None)
+            if paragraphs and paragraphs[-1][0] == speaker and speaker is not None:
+                paragraphs[-1][1].append(segment["text"])
+            else:
+                paragraphs.append((speaker, [segment["text"]]))
+    text = "\n".join(f"{speaker}: {' '.join(parts)}" if speaker else " ".join(parts) for speaker, parts in paragraphs)
+    return {"text": text, "segments": segments, "speakers": list(speakers)}
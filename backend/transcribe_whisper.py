@@ -1,30 +1,154 @@
 import openai
 import os
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from backend import transcript_cache
+from backend.audio_utils import detect_silences, extract_segment, plan_segments, probe_duration
+from backend.instrumentation import incr, instrument
+from backend.transcription_engines import get_engine
 
 # Load environment variables from .env file
 load_dotenv()
 
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024     #Whisper API file size limit, larger files are always transcribed in segments
+CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "900"))     #Longer recordings are split too, so their segments run in parallel (0 = split only over the upload limit)
+SEGMENT_SECONDS = int(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "600"))
+MAX_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+ENGINE = os.getenv("TRANSCRIPTION_ENGINE", "api")   #"api" (OpenAI Whisper) or "local" (on-box model, see backend/transcription_engines.py)
+
 # ─────────────────────────────────────────────────────────────────────────────
 # transcribe_audio()
-# Purpose: Transcribes audio files using OpenAI's Whisper model.
+# Purpose: Transcribes audio files with the selected transcription engine (OpenAI's Whisper API by default)
 # Parameters:
 #   - file_path (str): Path to the audio file (.mp3, .m4a, etc.)
+#   - model (str): Whisper model name
+#   - use_cache (bool): Reuse the transcript of a byte-identical file transcribed before (see backend/transcript_cache.py)
+#   - engine (str): "api" or "local" (defaults to TRANSCRIPTION_ENGINE). model only applies to the API engine
+#   - digest (str): file_digest() of the file when the caller already has it, so it is not hashed again
+#   - max_workers (int): Segments of a long recording uploaded at the same time (API engine)
 # Returns:
 #   - str: Transcribed text if successful, or an error message if failed.
 # ─────────────────────────────────────────────────────────────────────────────
-def transcribe_audio(file_path):
+@instrument("transcribe")
+def transcribe_audio(file_path, model="whisper-1", use_cache=True, engine=None, digest=None, max_workers=MAX_WORKERS):
     try:
-        # Initialize OpenAI API client using API key from environment variable
-        client = openai.OpenAI(api_key = os.getenv("OPENAI_API_KEY"))   #Open AI API Key from https://platform.openai.com/docs/overview
-        
-        # Open the audio file in binary read mode
-        with open(file_path, "rb") as audio_file:
-            # Send the audio to OpenAI's Whisper model for transcription
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",  # Use Whisper v1 model for transcription
-                file=audio_file
-            )
-        return transcript.text  # Return the transcribed text from the response
+        name = engine or ENGINE
+        options = {"model": model, "max_workers": max_workers} if name == "api" else {}
+        return get_engine(name, **options).transcribe(file_path, use_cache=use_cache, digest=digest)["text"]
     except Exception as e:
-        return f"❌ Error during transcription: {e}"
\ No newline at end of file
+        return f"❌ Error during transcription: {e}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# should_split()
+# Purpose: Decides between one Whisper request and parallel segments
+# Parameters:
+#   - file_path (str): File that would be uploaded
+#   - seconds (float): Its length when already known (e.g. from the pre-processing report), otherwise probed with ffprobe
+# Returns:
+#   - bool: True over the upload limit, or when the recording is longer than TRANSCRIBE_CHUNK_SECONDS
+# ─────────────────────────────────────────────────────────────────────────────
+def should_split(file_path, seconds=None):
+    if os.path.getsize(file_path) > MAX_UPLOAD_BYTES:
+        return True
+    if CHUNK_SECONDS <= 0:
+        return False
+    if seconds is None:
+        try:
+            seconds = probe_duration(file_path)
+        except (RuntimeError, ValueError):  #No ffprobe: a file under the limit can still go in one request
+            return False
+    return seconds > CHUNK_SECONDS
+
+
+# --- Cut one segment and transcribe it, retrying the upload with exponential backoff ---
+def _transcribe_segment(client, model, file_path, start, end, path, retries):
+    extract_segment(file_path, start, end, path)    #Runs on the worker thread, so cutting overlaps with other uploads
+    offset = start
+    for attempt in range(retries + 1):
+        try:
+            with open(path, "rb") as audio_file:
+                response = client.audio.transcriptions.create(
+                    model=model,
+                    file=audio_file,
+                    response_format="verbose_json"  #Includes per-segment timestamps
+                )
+            break
+        except Exception:
+            if attempt == retries:
+                raise
+            incr("whisper_retries_total")
+            time.sleep(2 ** attempt)    #1s, 2s, 4s, ...
+    incr("whisper_requests_total")
+    incr("whisper_upload_bytes_total", os.path.getsize(path))
+    return segments_from_response(response, offset)
+
+
+def segments_from_response(response, offset=0.0):
+    """
+    Converts a verbose_json Whisper response into [{"start", "end", "text"}, ...], shifted by offset seconds.
+    """
+    return [
+        {   #Whisper timestamps are relative to the uploaded file, shift them back onto the original recording
+            "start": round(offset + seg.start, 2),
+            "end": round(offset + seg.end, 2),
+            "text": seg.text.strip(),
+        }
+        for seg in (response.segments or [])
+    ] or [{"start": round(offset, 2), "end": round(offset, 2), "text": response.text.strip()}]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# transcribe_audio_chunked()
+# Purpose: Transcribes long recordings by splitting them into segments and sending them to Whisper concurrently
+# Parameters:
+#   - file_path (str): Path to the audio file
+#   - model (str): Whisper model name
+#   - segment_seconds (int): Target segment length (10 minutes of mono 64 kbps mp3 is ~5 MB, well under the upload limit)
+#   - max_workers (int): Number of segments transcribed at the same time
+#   - retries (int): Retries per segment before the whole transcription fails
+#   - align_to_silence (bool): Move each cut to a nearby silence so words are not cut in half
+#   - use_cache (bool): Reuse the result for a byte-identical file transcribed before
+#   - digest (str): file_digest() of the file when the caller already has it
+# Returns:
+#   - dict: {"text": str, "segments": [{"start", "end", "text"}, ...]} with timestamps in seconds of the original recording
+# Raises:
+#   - RuntimeError: if ffmpeg is missing or a segment still fails after all retries
+# ─────────────────────────────────────────────────────────────────────────────
+def transcribe_audio_chunked(file_path, model="whisper-1", segment_seconds=SEGMENT_SECONDS, max_workers=MAX_WORKERS,
+                             retries=3, align_to_silence=True, use_cache=True, digest=None):
+    cache_model = f"{model}:segments"   #Separate cache entry, this one stores the JSON with timestamps
+    digest = (digest or transcript_cache.file_digest(file_path)) if use_cache else None
+    if digest:
+        cached = transcript_cache.get(digest, cache_model)
+        if cached is not None:
+            return json.loads(cached)
+
+    duration = probe_duration(file_path)
+    silences = detect_silences(file_path) if align_to_silence else None
+    plan = plan_segments(duration, segment_seconds, silences)
+    client = openai.OpenAI(api_key = os.getenv("OPENAI_API_KEY"))   #One client (and connection pool) shared by all worker threads
+
+    with tempfile.TemporaryDirectory(prefix="briefly_segments_") as tmp_dir:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:   #Bounded: at most max_workers uploads in flight
+            futures = [pool.submit(_transcribe_segment, client, model, file_path, start, end,
+                                   os.path.join(tmp_dir, f"segment_{i:04d}.mp3"), retries)
+                       for i, (start, end) in enumerate(plan)]
+            try:
+                per_segment = [future.result() for future in futures]   #Results are collected in segment order
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                raise RuntimeError(f"❌ Error during transcription: {e}")
+
+    segments = [seg for chunk in per_segment for seg in chunk]
+    result = {
+        "text": " ".join(seg["text"] for seg in segments if seg["text"]),
+        "segments": segments,
+    }
+    if digest:
+        transcript_cache.put(digest, cache_model, json.dumps(result))
+    return result
@@ -0,0 +1,123 @@
+import hashlib
+import os
+import threading
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Transcript cache
+# - Whisper transcripts are stored on disk under a key made of the SHA-256 of the audio bytes plus the model name,
+#   so a byte-identical recording is never sent to the API twice, whatever its file name
+# - Size-based eviction: once the cache grows past TRANSCRIPT_CACHE_MAX_MB, the least recently used entries are deleted
+# - Hit / miss / eviction counters are kept per process and returned by stats()
+# ─────────────────────────────────────────────────────────────────────────────
+
+CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("outputs", "cache", "transcripts"))
+MAX_BYTES = int(float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "200")) * 1024 * 1024)
+CHUNK_SIZE = 1024 * 1024    #Audio is hashed 1 MB at a time, so large recordings are never fully loaded into memory
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+# --- Content hash of an audio file ---
+def file_digest(file_path):
+    """
+    Returns the SHA-256 hex digest of the file's bytes.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(digest, model):
+    key = hashlib.sha256(f"{model}:{digest}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.txt")
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# get()
+# Purpose: Looks up a cached transcript
+# Parameters:
+#   - digest (str): file_digest() of the audio
+#   - model (str): Transcription model name (e.g. whisper-1)
+# Returns:
+#   - str: Cached transcript, or None on a miss
+# ─────────────────────────────────────────────────────────────────────────────
+def get(digest, model):
+    path = _entry_path(digest, model)
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        _count("misses")
+        return None
+    try:
+        os.utime(path)  #Mark as recently used, eviction removes the oldest modification times first
+    except OSError:
+        pass
+    _count("hits")
+    return text
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# put()
+# Purpose: Stores a transcript and evicts old entries if the cache is over its size limit
+# Parameters:
+#   - digest (str): file_digest() of the audio
+#   - model (str): Transcription model name
+#   - text (str): Transcript to store
+# ─────────────────────────────────────────────────────────────────────────────
+def put(digest, model, text):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _entry_path(digest, model)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)  #Atomic rename: a concurrent reader never sees a half-written transcript
+    _count("writes")
+    evict()
+
+
+def evict(max_bytes=None):
+    """
+    Deletes least recently used entries until the cache is at most max_bytes (defaults to TRANSCRIPT_CACHE_MAX_MB).
+    Returns the number of entries removed.
+    """
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        entries = [e for e in os.scandir(CACHE_DIR) if e.is_file() and e.name.endswith(".txt")]
+    except OSError:
+        return 0
+    entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):   #Oldest first
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        with _lock:
+            _stats["evictions"] += removed
+    return removed
+
+
+def stats():
+    """
+    Returns the hit/miss/write/eviction counters of this process and the hit rate.
+    """
+    with _lock:
+        counters = dict(_stats)
+    lookups = counters["hits"] + counters["misses"]
+    counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else 0.0
+    return counters
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from backend import transcript_cache
+from backend.instrumentation import incr, set_attribute
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Transcription engines
+# - Every engine turns an audio file into {"text": str, "segments": [{"start", "end", "text"}, ...]} with timestamps in
+#   seconds of the original recording, so the rest of brieFly does not care where the transcript came from
+# - ApiEngine: OpenAI Whisper over the network (backend/transcribe_whisper.py), long files (and any over 25 MB) are
+#   cut and sent in parallel segments
+# - LocalEngine: a Whisper model run on this machine's CPU with faster-whisper (CTranslate2, int8 by default). No upload,
+#   no queueing and no API rate limits, at the cost of local CPU time. Needs `pip install faster-whisper`
+# - TRANSCRIPTION_ENGINE selects the engine used by transcribe_audio() ("api" by default)
+# - Results are cached per engine configuration in the content-addressed transcript cache
+# ─────────────────────────────────────────────────────────────────────────────
+
+LOCAL_MODEL = os.getenv("LOCAL_WHISPER_MODEL", "small")     #Model size name ("base", "small", "medium", ...) or path to a converted model
+LOCAL_COMPUTE_TYPE = os.getenv("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_THREADS = int(os.getenv("LOCAL_WHISPER_THREADS", "0"))   #0 lets CTranslate2 pick (one per physical core)
+LOCAL_BEAM_SIZE = int(os.getenv("LOCAL_WHISPER_BEAM_SIZE", "1"))   #1 = greedy decoding, the fastest. 5 is Whisper's default
+
+
+class TranscriptionEngine(ABC):
+    """
+    Base class of the transcription engines. Subclasses implement _transcribe() and cache_key.
+    """
+    name = None
+
+    @property
+    @abstractmethod
+    def cache_key(self):
+        """
+        Transcript cache entry name, unique per engine configuration that can produce a different transcript.
+        """
+
+    @abstractmethod
+    def _transcribe(self, file_path):
+        """
+        Returns {"text", "segments"} for the file, with segment times in seconds of the original recording.
+        """
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # transcribe()
+    # Parameters:
+    #   - file_path (str): Path to the audio file
+    #   - use_cache (bool): Reuse the result for a byte-identical file transcribed before by the same engine configuration
+    #   - digest (str): file_digest() of the file when the caller already has it, so it is not hashed again
+    # Returns:
+    #   - dict: {"text": str, "segments": [{"start", "end", "text"}, ...]}
+    # ─────────────────────────────────────────────────────────────────────────
+    def transcribe(self, file_path, use_cache=True, digest=None):
+        digest = (digest or transcript_cache.file_digest(file_path)) if use_cache else None
+        if digest:
+            cached = transcript_cache.get(digest, self.cache_key)
+            if cached is not None:
+                incr("transcript_cache_hits_total")
+                set_attribute(cached=True, engine=self.name)
+                return json.loads(cached)
+
+        set_attribute(cached=False, engine=self.name, file_bytes=os.path.getsize(file_path))
+        result = self._transcribe(file_path)
+        if digest:
+            transcript_cache.put(digest, self.cache_key, json.dumps(result))
+        return result
+
+
+class ApiEngine(TranscriptionEngine):
+    """
+    OpenAI Whisper API. One request for short files, parallel segments for long ones or those over the upload limit.
+    Args:
+        model (str): Whisper model name.
+        max_workers (int): Segments uploaded at the same time (defaults to TRANSCRIBE_WORKERS).
+    """
+    name = "api"
+
+    def __init__(self, model="whisper-1", max_workers=None):
+        self.model = model
+        self.max_workers = max_workers
+
+    @property
+    def cache_key(self):
+        return f"{self.model}:segments"     #Same entry as transcribe_audio_chunked(), so both reuse each other's results
+
+    def _transcribe(self, file_path):
+        import openai
+        from backend.audio_preprocess import prepared_audio, remap_segments
+        from backend.transcribe_whisper import MAX_WORKERS, segments_from_response, should_split, transcribe_audio_chunked
+
+        with prepared_audio(file_path) as (upload_path, report):
+            if should_split(upload_path, report["processed_seconds"] if report else None):
+                result = transcribe_audio_chunked(upload_path, model=self.model, max_workers=self.max_workers or MAX_WORKERS,
+                                                  use_cache=False)
+            else:
+                client = openai.OpenAI(api_key = os.getenv("OPENAI_API_KEY"))
+                with open(upload_path, "rb") as audio_file:
+                    response = client.audio.transcriptions.create(model=self.model, file=audio_file, response_format="verbose_json")
+                incr("whisper_requests_total")
+                incr("whisper_upload_bytes_total", os.path.getsize(upload_path))
+                segments = segments_from_response(response)
+                result = {"text": " ".join(seg["text"] for seg in segments if seg["text"]), "segments": segments}
+        if report:  #Silence was cut: move the timestamps back onto the original recording
+            result["segments"] = remap_segments(result["segments"], report["map"])
+        return result
+
+
+class LocalEngine(TranscriptionEngine):
+    """
+    Whisper on the local CPU through faster-whisper (CTranslate2).
+    Args:
+        model (str): Model size name, downloaded once by faster-whisper, or path to a CTranslate2 model directory.
+        compute_type (str): Weight precision, "int8" (fastest on CPU), "int8_float32" or "float32".
+        threads (int): CPU threads used by one transcription (0 = CTranslate2 default).
+        beam_size (int): Beam search width, 1 for greedy decoding.
+    """
+    name = "local"
+    _models = {}    #(model, compute_type, threads) -> WhisperModel, shared by every engine instance of the process
+    _lock = threading.Lock()
+
+    def __init__(self, model=LOCAL_MODEL, compute_type=LOCAL_COMPUTE_TYPE, threads=LOCAL_THREADS, beam_size=LOCAL_BEAM_SIZE):
+        self.model = model
+        self.compute_type = compute_type
+        self.threads = threads
+        self.beam_size = beam_size
+
+    @property
+    def cache_key(self):
+        return f"local:{os.path.basename(os.path.normpath(self.model))}:{self.compute_type}:beam{self.beam_size}"
+
+    def load(self):
+        """
+        Returns the shared WhisperModel, loading it on the first call.
+        """
+        key = (self.model, self.compute_type, self.threads)
+        with self._lock:    #Held during the load so concurrent first calls load the model only once
+            if key not in self._models:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError("The local transcription engine needs faster-whisper: pip install faster-whisper")
+                started = time.perf_counter()
+                self._models[key] = WhisperModel(self.model, device="cpu", compute_type=self.compute_type,
+                                                 cpu_threads=self.threads, local_files_only=os.getenv("BRIEFLY_OFFLINE") == "1")
+                load_seconds = round(time.perf_counter() - started, 3)
+                incr("local_whisper_load_seconds_total", load_seconds)
+                set_attribute(model_load_seconds=load_seconds)
+        return self._models[key]
+
+    def _transcribe(self, file_path):
+        model = self.load()
+        started = time.perf_counter()
+        pieces, info = model.transcribe(file_path, beam_size=self.beam_size)
+        segments = [{"start": round(seg.start, 2), "end": round(seg.end, 2), "text": seg.text.strip()}
+                    for seg in pieces]  #pieces is a generator: decoding happens while it is consumed
+        seconds = time.perf_counter() - started
+        incr("local_whisper_audio_seconds_total", round(info.duration, 2))
+        set_attribute(audio_seconds=round(info.duration, 2), rtf=round(seconds / info.duration, 3) if info.duration else None)
+        return {"text": " ".join(seg["text"] for seg in segments if seg["text"]), "segments": segments}
+
+
+ENGINES = {"api": ApiEngine, "local": LocalEngine}
+
+
+def get_engine(name=None, **options):
+    """
+    Returns a transcription engine by name ("api" or "local", defaults to TRANSCRIPTION_ENGINE).
+    options are passed to the engine, e.g. get_engine("local", beam_size=5).
+    """
+    name = name or os.getenv("TRANSCRIPTION_ENGINE", "api")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown transcription engine '{name}'. Choose one of {sorted(ENGINES)}.")
+    return ENGINES[name](**options)
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from backend.get_zoom_recordings import TIMEOUT, get_session
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Zoom cloud recording downloads
+# - Files are streamed to disk CHUNK_SIZE bytes at a time, never held in memory as a whole
+# - Data goes to "<name>.part" first. An interrupted transfer resumes with an HTTP Range request from the bytes already
+#   on disk, and the file is only renamed to its final name once complete
+# - Several recordings download at the same time over the pooled session from get_zoom_recordings.py
+# - download_recordings() yields progress and completion events, so the caller (the Streamlit script thread) can update
+#   the UI and start transcribing each file as soon as it lands
+# ─────────────────────────────────────────────────────────────────────────────
+
+CHUNK_SIZE = 1024 * 1024
+MAX_WORKERS = int(os.getenv("ZOOM_DOWNLOAD_WORKERS", "3"))
+MAX_RETRIES = 3
+PROGRESS_INTERVAL = 0.25    #Seconds between two progress events of the same file
+
+
+def recording_filename(recording):
+    """
+    Builds a file name that is stable for a recording (so a retry resumes the same .part file) and unique per meeting.
+    """
+    topic = re.sub(r"[^\w\-]+", "_", recording.get("topic") or "zoom_meeting").strip("_")[:60]
+    ext = (recording.get("file_type") or "mp4").lower()
+    short_id = hashlib.sha256(str(recording.get("id") or recording.get("download_url")).encode()).hexdigest()[:12]
+    return f"{short_id}_{topic}.{ext}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# download_file()
+# Purpose: Streams one URL to dest_path, resuming a previous partial download when possible
+# Parameters:
+#   - access_token (str): Zoom OAuth access token
+#   - url (str): Recording download_url
+#   - dest_path (str): Final file path
+#   - progress (callable): Optional progress(downloaded_bytes, total_bytes or None)
+# Returns:
+#   - str: dest_path
+# Raises:
+#   - RuntimeError: if the download still fails after MAX_RETRIES resumes
+# ─────────────────────────────────────────────────────────────────────────────
+def download_file(access_token, url, dest_path, progress=None):
+    if os.path.exists(dest_path):   #Finished in an earlier run
+        return dest_path
+    part_path = f"{dest_path}.part"
+    headers = {"Authorization": f"Bearer {access_token.strip()}"}
+
+    for attempt in range(MAX_RETRIES + 1):
+        done = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request_headers = dict(headers, Range=f"bytes={done}-") if done else headers
+        try:
+            with get_session().get(url, headers=request_headers, stream=True, timeout=TIMEOUT) as response:
+                if response.status_code == 416:     #Range starts at the end of the file: the .part is already complete
+                    break
+                if response.status_code not in (200, 206):
+                    raise RuntimeError(f"Download failed with status {response.status_code}: {response.text[:200]}")
+                if response.status_code == 200:    #Server ignored the Range header, start over
+                    done = 0
+                length = response.headers.get("Content-Length")
+                total = done + int(length) if length else None
+
+                last_report = 0.0
+                with open(part_path, "ab" if done else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        f.write(chunk)
+                        done += len(chunk)
+                        if progress and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                            last_report = time.monotonic()
+                            progress(done, total)
+                if total is not None and done < total:
+                    raise requests.ConnectionError(f"Connection closed after {done} of {total} bytes")
+            break
+        except requests.RequestException as e:     #Dropped connections, timeouts and truncated chunked bodies
+            if attempt == MAX_RETRIES:
+                raise RuntimeError(f"Download interrupted: {e}")
+            time.sleep(2 ** attempt)    #The next attempt resumes from the bytes already written
+
+    os.replace(part_path, dest_path)
+    if progress:
+        size = os.path.getsize(dest_path)
+        progress(size, size)
+    return dest_path
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# download_recordings()
+# Purpose: Downloads several recordings concurrently
+# Parameters:
+#   - access_token (str): Zoom OAuth access token
+#   - recordings (list[dict]): Recordings from fetch_recordings() / sync_recordings()
+#   - dest_dir (str): Folder the files are saved in
+#   - max_workers (int): Downloads running at the same time
+# Yields:
+#   - dict events, in the order they happen:
+#       {"type": "progress", "recording", "downloaded", "total"}
+#       {"type": "done", "recording", "path", "error"}   (path is None and error is set if the download failed)
+# ─────────────────────────────────────────────────────────────────────────────
+def download_recordings(access_token, recordings, dest_dir="recordings", max_workers=MAX_WORKERS):
+    os.makedirs(dest_dir, exist_ok=True)
+    events = queue.Queue()
+
+    def worker(recording):
+        try:
+            if not recording.get("download_url"):
+                raise RuntimeError("Recording has no download URL.")
+            path = download_file(
+                access_token,
+                recording["download_url"],
+                os.path.join(dest_dir, recording_filename(recording)),
+                progress=lambda done, total: events.put({"type": "progress", "recording": recording, "downloaded": done, "total": total}),
+            )
+            events.put({"type": "done", "recording": recording, "path": path, "error": None})
+        except Exception as e:
+            events.put({"type": "done", "recording": recording, "path": None, "error": str(e)})
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="zoom-download") as pool:
+        for recording in recordings:
+            pool.submit(worker, recording)
+        remaining = len(recordings)
+        while remaining:
+            event = events.get()
+            if event["type"] == "done":
+                remaining -= 1
+            yield event
+
@@ -0,0 +1,211 @@
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Local stand-ins for the OpenAI and Zoom APIs
+# - Speak just enough of both APIs for backend/ to run unchanged against them (point OPENAI_BASE_URL and
+#   ZOOM_API_BASE at the servers)
+# - Latency, streaming speed, error rate and Zoom pagination are configurable through FakeConfig, so benchmarks can
+#   measure the pipeline without keys, cost or network noise
+# ─────────────────────────────────────────────────────────────────────────────
+
+class FakeConfig:
+    """
+    Behaviour of the fake servers.
+    Args:
+        latency (float): Seconds added to every response.
+        latency_per_1k_tokens (float): Extra seconds per 1000 prompt tokens (long prompts are slower, like the real API).
+        token_delay (float): Seconds between two streamed chunks.
+        error_rate (float): Share of requests answered with a 429 or 500 instead of a result.
+        meetings_per_day (int): Zoom recordings generated for every day of a requested window.
+        seed (int): Seed of the random error injection.
+    """
+    def __init__(self, latency=0.05, latency_per_1k_tokens=0.01, token_delay=0.002, error_rate=0.0, meetings_per_day=2, seed=0):
+        self.latency = latency
+        self.latency_per_1k_tokens = latency_per_1k_tokens
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.meetings_per_day = meetings_per_day
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {}  #Path -> number of requests served, handy to check pagination and retries
+
+    def count(self, path):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+FAKE_REPLY = (
+    "Summary: The team reviewed the release plan and agreed on the Q3 deadline.\n\n"
+    "Action items:\n- Alice to finalize the test plan by Friday.\n- Bob to update the roadmap.\n- Carol to book the demo."
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config = None   #Set on the subclass created by start_fake_servers()
+    protocol_version = "HTTP/1.1"   #Keep-alive, so pooled clients reuse connections like they would with the real APIs
+
+    def log_message(self, *args):   #Keep benchmark output clean
+        pass
+
+    def _json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self):
+        if self.config.should_fail():
+            if self.config.random.random() < 0.5:
+                self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit"}}, {"Retry-After": "0"})
+            else:
+                self._json(500, {"error": {"message": "Fake server error", "type": "server_error"}})
+            return True
+        return False
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+
+class FakeOpenAIHandler(_Handler):
+    def do_POST(self):
+        path = urlparse(self.path).path
+        self.config.count(path)
+        body = self._body()
+        if self._error():
+            return
+        if path.endswith("/audio/transcriptions"):
+            self._transcription(body)
+        elif path.endswith("/chat/completions"):
+            self._chat(json.loads(body))
+        else:
+            self._json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def _transcription(self, body):
+        #Pretend every 16 kB of audio is one spoken sentence
+        sentences = max(len(body) // 16000, 1)
+        time.sleep(self.config.latency + 0.001 * sentences)
+        segments = [{"id": i, "start": 5.0 * i, "end": 5.0 * (i + 1), "text": f" Sentence {i} of the fake meeting."}
+                    for i in range(sentences)]
+        self._json(200, {
+            "text": "".join(seg["text"] for seg in segments).strip(),
+            "language": "english",
+            "duration": 5.0 * sentences,
+            "segments": segments,
+        })
+
+    def _chat(self, request):
+        prompt_tokens = sum(len(m.get("content", "")) // 4 for m in request.get("messages", []))
+        time.sleep(self.config.latency + self.config.latency_per_1k_tokens * prompt_tokens / 1000)
+        completion_tokens = len(FAKE_REPLY) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": request.get("model", "gpt-4o")}
+
+        if not request.get("stream"):
+            self._json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": FAKE_REPLY}, "finish_reason": "stop"}]})
+            return
+
+        #Server-sent events, one word per chunk, closed by a usage chunk and [DONE]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload):
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+
+        for word in re.findall(r"\S+\s*", FAKE_REPLY):
+            time.sleep(self.config.token_delay)
+            send({**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]})
+        send({**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if request.get("stream_options", {}).get("include_usage"):
+            send({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeZoomHandler(_Handler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.config.count(url.path)
+        if self._error():
+            return
+        time.sleep(self.config.latency)
+        if url.path.endswith("/users/me"):
+            self._json(200, {"id": "fake-user", "email": "fake@example.com"})
+        elif url.path.endswith("/users/me/recordings"):
+            self._recordings({k: v[0] for k, v in parse_qs(url.query).items()})
+        else:
+            self._json(404, {"message": f"Unknown path {url.path}"})
+
+    def _recordings(self, params):
+        start = date.fromisoformat(params.get("from", date.today().isoformat()))
+        end = date.fromisoformat(params.get("to", date.today().isoformat()))
+        page_size = int(params.get("page_size", 30))
+        offset = int(params.get("next_page_token") or 0)
+
+        meetings = []
+        day = start
+        while day <= end:
+            for n in range(self.config.meetings_per_day):
+                meeting_id = f"{day.isoformat()}-{n}"
+                meetings.append({
+                    "uuid": meeting_id,
+                    "topic": f"Fake meeting {meeting_id}",
+                    "start_time": f"{day.isoformat()}T{9 + n:02d}:00:00Z",
+                    "duration": 30,
+                    "recording_files": [{"file_type": "M4A", "file_size": 1_000_000,
+                                         "download_url": f"http://{self.headers['Host']}/rec/{meeting_id}.m4a"}],
+                })
+            day += timedelta(days=1)
+
+        page = meetings[offset:offset + page_size]
+        next_token = str(offset + page_size) if offset + page_size < len(meetings) else ""
+        self._json(200, {"from": start.isoformat(), "to": end.isoformat(), "page_size": page_size,
+                         "total_records": len(meetings), "next_page_token": next_token, "meetings": page})
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# start_fake_servers()
+# Purpose: Starts both fake servers on free local ports, each on its own daemon thread
+# Returns:
+#   - dict: {"openai_base_url", "zoom_api_base", "config", "shutdown"}
+# ─────────────────────────────────────────────────────────────────────────────
+def start_fake_servers(config=None):
+    config = config or FakeConfig()
+    servers = []
+    for handler in (FakeOpenAIHandler, FakeZoomHandler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), type(handler.__name__, (handler,), {"config": config}))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+    def shutdown():
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    return {
+        "openai_base_url": f"http://127.0.0.1:{servers[0].server_address[1]}/v1",
+        "zoom_api_base": f"http://127.0.0.1:{servers[1].server_address[1]}/v2",
+        "config": config,
+        "shutdown": shutdown,
+    }
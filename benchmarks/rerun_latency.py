@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.model_registry import current_rss_mb
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Streamlit rerun cost
+# - Runs frontend/app.py headlessly with Streamlit's AppTest, once cold and then --reruns more times,
+#   which is what happens on every widget interaction
+# - Reports the cold run, mean / p95 rerun time, resident and peak memory, and whether torch got imported
+#
+# Usage (from the repo root):
+#   python benchmarks/rerun_latency.py --reruns 50
+# To compare before and after a change, point --app at the old version of the script:
+#   git show HEAD~1:frontend/app.py > frontend/app_before.py
+#   python benchmarks/rerun_latency.py --app frontend/app_before.py --reruns 50
+# ─────────────────────────────────────────────────────────────────────────────
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:     #Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def measure(app_path="frontend/app.py", reruns=20):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(app_path, default_timeout=60)
+    started = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - started
+
+    times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return {
+        "cold_run_ms": round(1000 * cold, 1),
+        "rerun_mean_ms": round(1000 * statistics.mean(times), 1),
+        "rerun_p95_ms": round(1000 * times[int(0.95 * (len(times) - 1))], 1),
+        "rss_mb": current_rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+        "torch_loaded": "torch" in sys.modules,
+        "exceptions": [str(e.value) for e in app.exception],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the per-rerun time and memory of the Streamlit app.")
+    parser.add_argument("--app", default="frontend/app.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(measure(args.app, args.reruns), indent=2))
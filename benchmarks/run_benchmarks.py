@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+from benchmarks.fake_servers import FakeConfig, start_fake_servers
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Offline benchmark suite
+# - Starts the fake OpenAI and Zoom servers and points backend/ at them, so every stage can be timed without keys
+# - Times Whisper transcription, summarization (single call and map-reduce), streaming, suggestions and the Zoom
+#   listing for short, medium and long synthetic meetings, plus local sentiment throughput and memory
+# - Writes one JSON file per run. Pass --compare with an earlier file to flag stages that got slower
+#
+# Usage (from the repo root):
+#   python benchmarks/run_benchmarks.py --repeats 5 --latency 0.05
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/<earlier run>.json
+# ─────────────────────────────────────────────────────────────────────────────
+
+SIZES = {"short": 300, "medium": 3000, "long": 60000}     #Words per synthetic transcript (long goes through map-reduce)
+AUDIO_BYTES = {"short": 200_000, "medium": 2_000_000}
+LONG_AUDIO_SECONDS = 1000   #16.7 minutes of 16 kHz 16-bit wav: ~32 MB, over the upload limit and TRANSCRIBE_CHUNK_SECONDS
+
+_PHRASES = [
+    "we need to finalize the release plan before the Q3 deadline",
+    "Alice will update the test plan and share it with the team",
+    "the customer feedback on the new dashboard was mostly positive",
+    "Bob raised a concern about the database migration timeline",
+    "let's schedule a follow-up with design next Tuesday",
+    "the budget for the pilot has been approved by finance",
+    "I'm worried the onboarding flow is still confusing for new users",
+    "Carol will book the demo room and send the invite",
+]
+
+
+def make_transcript(words, seed=0):
+    """
+    Returns a synthetic meeting transcript of about `words` words, the same for the same seed.
+    """
+    rng = random.Random(seed)
+    sentences, count = [], 0
+    while count < words:
+        sentence = f"{rng.choice(['Alice', 'Bob', 'Carol', 'Dan'])}: {rng.choice(_PHRASES).capitalize()}."
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return " ".join(sentences)
+
+
+def _failed(result):
+    return isinstance(result, str) and result.startswith("❌")     #The backend functions return error messages instead of raising
+
+
+def timed(func, repeats):
+    """
+    Calls func() repeats times and returns the timing summary and the last result.
+    Runs that return a "❌ ..." error message are counted in errors and left out of the timings.
+    """
+    seconds, errors, result = [], 0, None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = func()
+        if _failed(result):
+            errors += 1
+        else:
+            seconds.append(time.perf_counter() - started)
+    if not seconds:
+        return {"runs": repeats, "errors": errors, "last_error": result[:200]}, result
+    seconds.sort()
+    return {
+        "runs": repeats,
+        "errors": errors,
+        "median_ms": round(1000 * statistics.median(seconds), 2),
+        "p95_ms": round(1000 * seconds[int(0.95 * (len(seconds) - 1))], 2),
+        "min_ms": round(1000 * seconds[0], 2),
+    }, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+# --- Decodable noise, so ffmpeg can measure, pre-process and cut it | returns None when ffmpeg is not installed ---
+def make_audio(path, seconds):
+    from backend.audio_utils import FFMPEG
+    try:
+        subprocess.run([FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi", "-i",
+                        f"anoisesrc=d={seconds}:c=pink:r=16000:a=0.1", "-ac", "1", "-c:a", "pcm_s16le", path], check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return path
+
+
+def bench_openai(repeats):
+    from backend.transcribe_whisper import transcribe_audio, transcribe_audio_chunked
+    from backend.summarize_gpt import summarize_actions, generate_suggestions, summarize_actions_stream
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size, n_bytes in AUDIO_BYTES.items():
+            path = os.path.join(tmp_dir, f"{size}.mp3")
+            with open(path, "wb") as f:
+                f.write(os.urandom(n_bytes))    #The fake server only looks at the size
+            results[f"transcribe_{size}"], _ = timed(lambda: transcribe_audio(path, use_cache=False), repeats)
+
+        #The long recording goes through the segmented path, which needs real audio for ffprobe and the cuts
+        path = make_audio(os.path.join(tmp_dir, "long.wav"), LONG_AUDIO_SECONDS)
+        if path is None:
+            results["transcribe_long"] = results["transcribe_chunked_long"] = {"skipped": "ffmpeg not found"}
+        else:
+            results["transcribe_long"], _ = timed(lambda: transcribe_audio(path, use_cache=False), repeats)
+            results["transcribe_long"]["file_bytes"] = os.path.getsize(path)
+            def chunked():  #Without pre-processing | raises instead of returning an error message
+                try:
+                    return transcribe_audio_chunked(path, use_cache=False)["text"]
+                except RuntimeError as e:
+                    return str(e) if str(e).startswith("❌") else f"❌ {e}"
+            results["transcribe_chunked_long"], _ = timed(chunked, repeats)
+
+    for size, words in SIZES.items():
+        transcript = make_transcript(words, seed=words)
+        results[f"summarize_{size}"], _ = timed(lambda: summarize_actions(transcript), repeats)
+        results[f"suggestions_{size}"], _ = timed(lambda: generate_suggestions(transcript, "Neutral"), repeats)
+
+        metrics = {}
+        def stream():
+            metrics.clear()
+            try:
+                return "".join(summarize_actions_stream(transcript, metrics))
+            except Exception as e:  #Failed after the first chunks
+                return f"❌ {e}"
+        results[f"summarize_stream_{size}"], _ = timed(stream, repeats)
+        results[f"summarize_stream_{size}"]["last_time_to_first_token_ms"] = round(1000 * metrics.get("time_to_first_token", 0), 2)
+    return results
+
+
+def bench_zoom(repeats, config):
+    from backend.get_zoom_recordings import fetch_recordings
+
+    results = {}
+    for days in (30, 365):
+        before = dict(config.requests)
+        timing, recordings = timed(lambda: fetch_recordings("fake-token", since=date.today() - timedelta(days=days - 1)), repeats)
+        timing["recordings"] = len(recordings)
+        timing["requests_per_run"] = (sum(config.requests.values()) - sum(before.values())) // repeats
+        results[f"zoom_list_{days}d"] = timing
+    return results
+
+
+def bench_sentiment(repeats):
+    try:
+        from backend.model_registry import current_rss_mb, load_stats
+        from backend.sentiment_analysis import analyze_sentiment_windows, get_scheduler
+        rss_before = current_rss_mb()
+        analyze_sentiment_windows("warm up")    #Loads the model, outside of the timings
+    except Exception as e:  #torch/transformers missing, or the model is not available offline
+        return {"sentiment": {"skipped": str(e)}}
+
+    results = {"sentiment_model_load": {**load_stats(), "rss_before_mb": rss_before}}
+    for size, words in SIZES.items():
+        transcript = make_transcript(words, seed=words)
+        timing, output = timed(lambda: analyze_sentiment_windows(transcript), repeats)
+        timing["windows"] = output["windows"]
+        timing["windows_per_sec"] = round(output["windows"] / (timing["median_ms"] / 1000), 2) if timing["median_ms"] else 0.0
+        timing["rss_after_mb"] = current_rss_mb()
+        results[f"sentiment_{size}"] = timing
+    results["sentiment_scheduler"] = get_scheduler().stats()
+    return results
+
+
+def compare(current, previous_path, threshold):
+    """
+    Prints the stages whose median time grew by more than threshold (e.g. 0.2 = 20%) since previous_path.
+    Returns the number of regressions.
+    """
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)["stages"]
+    regressions = 0
+    for stage, timing in current["stages"].items():
+        old = previous.get(stage, {}).get("median_ms")
+        new = timing.get("median_ms")
+        if old and new and new > old * (1 + threshold):
+            regressions += 1
+            print(f"REGRESSION {stage}: {old} ms -> {new} ms (+{100 * (new / old - 1):.0f}%)", file=sys.stderr)
+    return regressions
+
+
+def run(args):
+    config = FakeConfig(latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate,
+                        meetings_per_day=args.meetings_per_day)
+    servers = start_fake_servers(config)
+    #Must be set before backend/ is imported: the modules read them at import or client creation time
+    os.environ.update({
+        "OPENAI_BASE_URL": servers["openai_base_url"],
+        "OPENAI_API_KEY": "fake-key",
+        "ZOOM_API_BASE": servers["zoom_api_base"],
+        "LLM_CACHE": "0",   #Measure the requests themselves, not the response cache
+    })
+    try:
+        stages = {}
+        stages.update(bench_openai(args.repeats))
+        stages.update(bench_zoom(args.repeats, config))
+        if not args.skip_sentiment:
+            stages.update(bench_sentiment(args.repeats))
+    finally:
+        servers["shutdown"]()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {"repeats": args.repeats, "latency": args.latency, "token_delay": args.token_delay,
+                       "error_rate": args.error_rate, "meetings_per_day": args.meetings_per_day},
+            "requests_served": config.requests,
+        },
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark brieFly offline against fake OpenAI and Zoom servers.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every fake API response")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Seconds between streamed chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake API requests that fail with 429/500")
+    parser.add_argument("--meetings-per-day", type=int, default=2, help="Fake Zoom recordings per day")
+    parser.add_argument("--skip-sentiment", action="store_true", help="Don't load the local RoBERTa model")
+    parser.add_argument("--out", help="Results file (defaults to benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown that counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = run(args)
+    out = args.out or os.path.join(ROOT, "benchmarks", "results",
+                                   f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{report['meta']['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["stages"], indent=2))
+    print(f"Results written to {out}", file=sys.stderr)
+    if args.compare and compare(report, args.compare, args.threshold):
+        sys.exit(1)
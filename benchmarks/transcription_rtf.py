@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.audio_utils import probe_duration
+from backend.transcription_engines import get_engine
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Transcription real-time factor
+# - Transcribes the same recordings with each engine (cache off) and reports the real-time factor:
+#   processing seconds / audio seconds, so 0.25 means an hour of audio takes 15 minutes
+# - Also reports the word error rate of every engine against the first one (the API by default), as a rough check
+#   that a faster local configuration did not lose too much accuracy
+# - The local engine's model load is timed separately, it is paid once per process
+#
+# Usage (from the repo root):
+#   python benchmarks/transcription_rtf.py recordings/standup.m4a recordings/retro.mp3
+#   python benchmarks/transcription_rtf.py meeting.m4a --engines local --model base --threads 4 --beam-size 1 5
+# ─────────────────────────────────────────────────────────────────────────────
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word-level edit distance between two transcripts, divided by the number of reference words.
+    """
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return round(previous[-1] / len(ref), 3) if ref else 0.0
+
+
+def configurations(args):
+    for name in args.engines:
+        if name == "local":
+            for beam_size in args.beam_size:
+                options = {"beam_size": beam_size, "threads": args.threads, "compute_type": args.compute_type}
+                if args.model:
+                    options["model"] = args.model
+                yield f"local beam={beam_size}", get_engine("local", **options)
+        else:
+            yield name, get_engine(name)
+
+
+def measure(files, args):
+    results = {}
+    for label, engine in configurations(args):
+        load_seconds = None
+        if hasattr(engine, "load"):
+            started = time.perf_counter()
+            engine.load()
+            load_seconds = round(time.perf_counter() - started, 2)
+
+        runs, audio_total, seconds_total = [], 0.0, 0.0
+        for path in files:
+            audio_seconds = probe_duration(path)
+            started = time.perf_counter()
+            output = engine.transcribe(path, use_cache=False)
+            seconds = time.perf_counter() - started
+            audio_total += audio_seconds
+            seconds_total += seconds
+            runs.append({"file": os.path.basename(path), "audio_seconds": round(audio_seconds, 1),
+                         "seconds": round(seconds, 2), "rtf": round(seconds / audio_seconds, 3) if audio_seconds else None,
+                         "text": output["text"]})
+        results[label] = {"model_load_seconds": load_seconds, "rtf": round(seconds_total / audio_total, 3) if audio_total else None, "files": runs}
+
+    reference = next(iter(results.values()), None)
+    for result in results.values():     #Accuracy relative to the first configuration
+        for run, ref_run in zip(result["files"], reference["files"]):
+            run["wer_vs_first"] = word_error_rate(ref_run["text"], run["text"])
+    for result in results.values():
+        for run in result["files"]:
+            del run["text"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the real-time factor of the transcription engines.")
+    parser.add_argument("files", nargs="+", help="Audio files to transcribe")
+    parser.add_argument("--engines", nargs="+", default=["api", "local"], choices=["api", "local"])
+    parser.add_argument("--model", help="Local model size name or path (defaults to LOCAL_WHISPER_MODEL)")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--threads", type=int, default=0, help="Local engine CPU threads (0 = all physical cores)")
+    parser.add_argument("--beam-size", type=int, nargs="+", default=[1], help="One local run per beam size")
+    args = parser.parse_args()
+    print(json.dumps(measure(args.files, args), indent=2))
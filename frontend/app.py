@@ -13,11 +13,24 @@ import sys
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import base64
+import hashlib
+import queue
+import tempfile
+import threading
+import time
+import uuid
+
+_rerun_started = time.perf_counter()    #Streamlit reruns this whole script on every interaction, timed at the bottom of the file
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 load_dotenv()   #Load the variables from the .env file
 
+#Optionally load the sentiment model in the background as soon as the app starts, instead of on the first "Get Meeting Mood" click
+if os.getenv("SENTIMENT_WARMUP") == "1":
+    from backend.model_registry import warmup
+    warmup(background=True)
+
 def zoom_token_check():   #Zoom API Tokens expire after 1 hour | To check if the token is valid or expired
     if "token_time" not in st.session_state:
         return True
@@ -28,11 +41,17 @@ CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 REDIRECT_URI = os.getenv("REDIRECT_URI", "http://localhost:8501")
 
+#Stream the GPT summary and suggestions into the page as they are generated (set to 0 to get them from the background job instead)
+STREAM_OUTPUT = os.getenv("BRIEFLY_STREAM_OUTPUT", "1") == "1"
+#Downloaded Zoom recordings transcribed at the same time, per session
+ZOOM_TRANSCRIBE_WORKERS = int(os.getenv("ZOOM_TRANSCRIBE_WORKERS", "2"))
+
 #Configures the default settings of the page.
 st.set_page_config(page_title="brieFly", page_icon="./assets/icon.png", layout="centered")
 
 # --- Setting Background Image - START ---
-# Convert image to base64
+# Convert image to base64 | cached once per process, so reruns don't re-read and re-encode the image
+@st.cache_resource
 def get_base64_image(path):
     """
     Reads an image file and encodes it into base64 format for CSS embedding.
@@ -97,7 +116,61 @@ with col2:
             st.session_state.upload_clicked = True
         st.markdown("<p style='text-align:center; color:rgba(250, 250, 250, 0.6); font-size: 0.8rem;'>Upload a .mp3, .m4a, .vtt, or .txt file to analyze your meeting instantly.</p>", unsafe_allow_html=True)
 
-st.markdown("---")  
+st.markdown("---")
+
+RESULT_KEYS = ("summary_output", "suggestions", "meeting_sentiment", "sentiment_timeline", "speaker_sentiment",
+               "stream_metrics", "analysis_timings", "analysis_errors")
+
+def clear_results():
+    """
+    Removes the analysis results of the meeting shown before, so a stage that fails (or has not run yet) for the next
+    meeting can't leave the previous meeting's output on the page.
+    """
+    for key in RESULT_KEYS:
+        st.session_state.pop(key, None)
+
+def store_analysis(analysis):
+    """
+    Replaces the results in st.session_state with those of the analysis pipeline, so they survive reruns.
+    Args:
+        analysis (dict): Output of backend.pipeline.analyze_transcript().
+    """
+    clear_results()
+    results = analysis["results"]
+    if "summary" in results:
+        st.session_state["summary_output"] = results["summary"]
+    if "sentiment" in results:
+        st.session_state["meeting_sentiment"] = results["sentiment"]["sentiment"]
+        st.session_state["sentiment_timeline"] = results["sentiment"]["timeline"]
+    if "suggestions" in results:
+        st.session_state["suggestions"] = results["suggestions"]
+    if "speakers" in results:
+        st.session_state["speaker_sentiment"] = results["speakers"]
+    st.session_state["analysis_timings"] = analysis["timings"]
+    st.session_state["analysis_errors"] = analysis["errors"]
+
+# --- Search past meetings | full-text index of every transcript and summary produced so far (backend/search_index.py) ---
+search_query = st.text_input("🔎 Search past meetings", placeholder="e.g. Q3 deadline")
+if search_query.strip():
+    from backend.search_index import get_index
+    search_results = get_index().search(search_query, limit=10)
+    if not search_results:
+        st.caption("No meetings match your search.")
+    for result in search_results:
+        st.markdown(f"**{result['title']}** · {datetime.fromtimestamp(result['updated_at']).strftime('%d %B %Y')}")
+        st.caption(result["snippet"])
+        if st.button("Open", key=f"open_{result['meeting_id']}"):
+            meeting = get_index().get(result["meeting_id"])
+            clear_results()
+            #Drop the previous upload and its job, so neither the Transcribe button nor a finishing job acts on this meeting
+            for key in ("audio_path", "job_id"):
+                st.session_state.pop(key, None)
+            st.query_params.pop("job", None)
+            st.session_state.update({"file_id": meeting["meeting_id"], "upload_file_name": meeting["title"],
+                                     "transcript_text": meeting["transcript"]})
+            if meeting["summary"]:
+                st.session_state["summary_output"] = meeting["summary"]
+    st.markdown("---")
 
 # --- Handle Zoom redirect code (when returning from Zoom auth) ---
 if "access_token" not in st.session_state and "code" in st.query_params:    #If access token is not yet fetched and redicrect code is available
@@ -163,6 +236,31 @@ if "access_token" not in st.session_state:
         with col2:
             st.markdown(zoom_login_button, unsafe_allow_html=True)
 
+def save_upload(upload_file, upload_dir, chunk_size=1024 * 1024):
+    """
+    Copies an uploaded file to disk in chunks (never as one big bytes object) while hashing it.
+    The saved name is prefixed with a hash of the content, so two different files that share a name don't overwrite each other.
+    Args:
+        upload_file (UploadedFile): File from st.file_uploader.
+        upload_dir (str): Folder to save it in.
+        chunk_size (int): Bytes copied at a time.
+    Returns:
+        tuple: (file_id, file_path)
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    upload_file.seek(0)
+    #Unique temp file: every Streamlit session is a thread of the same process, so two users may upload the same name at once
+    with tempfile.NamedTemporaryFile(dir=upload_dir, prefix=".upload_", delete=False) as f:
+        tmp_path = f.name
+        for chunk in iter(lambda: upload_file.read(chunk_size), b""):
+            digest.update(chunk)
+            f.write(chunk)
+    file_id = f"{digest.hexdigest()[:12]}_{upload_file.name}"
+    file_path = os.path.join(upload_dir, file_id)  #Set file path
+    os.replace(tmp_path, file_path)
+    return file_id, file_path
+
 # --- Upload a file ---
 if st.session_state.upload_clicked:
     upload_file = st.file_uploader("Upload your .mp3/.m4a/.txt/.vtt file", type=["mp3", "m4a", "vtt", "txt"])
@@ -172,16 +270,17 @@ if st.session_state.upload_clicked:
             st.error("No file selected.")
         else:
             upload_dir = "recordings"   #Create a directory and upload the file for processing
-            os.makedirs(upload_dir, exist_ok=True)
-            file_path = os.path.join(upload_dir, upload_file.name)  #Set file path
-
-            with open(file_path, "wb") as f:
-                f.write(upload_file.read())
+            file_id, file_path = save_upload(upload_file, upload_dir)
 
-            st.success(f"✅ File successfully uploaded and ready for transcription")
-            st.audio(file_path, format="audio/m4a") #Display an audio player for the uploaded file
+            from backend.text_ingest import is_text_transcript
+            if is_text_transcript(file_path):   #.vtt/.txt are read as they are, Whisper is skipped
+                st.success(f"✅ Transcript successfully uploaded and ready for analysis")
+            else:
+                st.success(f"✅ File successfully uploaded and ready for transcription")
+                st.audio(file_path, format="audio/m4a") #Display an audio player for the uploaded file
             st.session_state["audio_path"] = file_path  # Save path for Whisper
             st.session_state["upload_file_name"] = upload_file.name
+            st.session_state["file_id"] = file_id
 
 # --- Fetch Recordings from Zoom API ---
 if "access_token" in st.session_state and not st.session_state.upload_clicked:
@@ -189,69 +288,231 @@ if "access_token" in st.session_state and not st.session_state.upload_clicked:
         if zoom_token_check():
             st.warning("😵 Session expired. Please log in again.")
         else:
-            from backend.get_zoom_recordings import fetch_recordings
-            recordings = fetch_recordings(st.session_state["access_token"])
-            if recordings:
-                st.write("📼 Your Zoom Recordings:")
-                for rec in recordings:
-                    topic = rec.get("topic", "Untitled Meeting")
-                    start_time_raw = rec.get("start_time")
-                    start_time = datetime.strptime(start_time_raw, "%Y-%m-%dT%H:%M:%SZ")
-                    formatted_date = start_time.strftime("%B %Y")  # e.g., May 2025
-
-                    duration = rec.get("duration", 0)  # In minutes
-                    hours = duration // 60
-                    minutes = duration % 60
-                    if hours:
-                        duration_str = f"{hours}h {minutes}m"
-                    else:
-                        duration_str = f"{minutes} minutes"
-
-                    download_url = rec.get("download_url")
-
-                    st.markdown(
-                        f"**{topic} – {formatted_date}** ({duration_str}) – [Download Link]({download_url})"
-                    )
-            else:
+            from backend.get_zoom_recordings import sync_recordings
+            try:
+                #Incremental: only meetings since the last sync of this Zoom account are requested from the API
+                with st.spinner("Syncing your Zoom recordings..."):
+                    recordings = sync_recordings(st.session_state["access_token"])
+            except RuntimeError as e:
+                st.error(f"❌ Failed to fetch recordings: {e}")
+                recordings = []
+            st.session_state["zoom_recordings"] = recordings   #Kept across reruns so recordings can be picked for download
+            if not recordings:
                 st.warning("No recordings found.")
 
-#Transcription using OpenAI Whisper
+    if st.session_state.get("zoom_recordings"):
+        st.write("📼 Your Zoom Recordings:")
+        recording_labels = {}   #Recording id -> label shown in the picker
+        recordings_by_id = {}
+        for rec in st.session_state["zoom_recordings"]:
+            topic = rec.get("topic", "Untitled Meeting")
+            start_time_raw = rec.get("start_time")
+            start_time = datetime.strptime(start_time_raw, "%Y-%m-%dT%H:%M:%SZ")
+            formatted_date = start_time.strftime("%B %Y")  # e.g., May 2025
+
+            duration = rec.get("duration", 0)  # In minutes
+            hours = duration // 60
+            minutes = duration % 60
+            if hours:
+                duration_str = f"{hours}h {minutes}m"
+            else:
+                duration_str = f"{minutes} minutes"
+
+            download_url = rec.get("download_url")
+
+            st.markdown(
+                f"**{topic} – {formatted_date}** ({duration_str}) – [Download Link]({download_url})"
+            )
+            #Topic and start minute can repeat (e.g. a meeting restarted), the recording id keeps the options apart
+            recording_labels[rec["id"]] = f"{topic} – {start_time.strftime('%d %B %Y %H:%M')} · {rec['id']}"
+            recordings_by_id[rec["id"]] = rec
+
+        selected_ids = st.multiselect("Recordings to download and transcribe", list(recording_labels),
+                                      format_func=recording_labels.get)
+        if st.button("⬇️ Download & Transcribe") and selected_ids:
+            if zoom_token_check():
+                st.warning("😵 Session expired. Please log in again.")
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                from backend.zoom_downloader import download_recordings
+                from backend.transcribe_whisper import transcribe_audio
+                from backend.search_index import index_meeting
+
+                selected = [recordings_by_id[rec_id] for rec_id in selected_ids]
+                bars = {rec["id"]: st.progress(0.0, text=f"{rec.get('topic')} – waiting") for rec in selected}
+                transcribing = {}
+                #Downloads stream into recordings/ concurrently, and each file is handed to Whisper as soon as it is complete
+                with ThreadPoolExecutor(max_workers=max(min(len(selected), ZOOM_TRANSCRIBE_WORKERS), 1)) as transcribe_pool:
+                    for event in download_recordings(st.session_state["access_token"], selected, "recordings"):
+                        rec = event["recording"]
+                        bar = bars[rec["id"]]
+                        if event["type"] == "progress":
+                            done, total = event["downloaded"], event["total"]
+                            size = f"{done / 1e6:.1f} / {total / 1e6:.1f} MB" if total else f"{done / 1e6:.1f} MB"
+                            bar.progress(min(done / total, 1.0) if total else 0.0, text=f"{rec.get('topic')} – {size}")
+                        elif event["error"]:
+                            bar.progress(0.0, text=f"❌ {rec.get('topic')} – {event['error']}")
+                        else:
+                            bar.progress(1.0, text=f"📝 {rec.get('topic')} – downloaded, transcribing...")
+                            transcribing[transcribe_pool.submit(transcribe_audio, event["path"])] = (rec, event["path"])
+
+                    for future, (rec, path) in transcribing.items():
+                        transcript_text = future.result()
+                        if transcript_text.startswith("❌"):    #Nothing is saved, so the failed recording can simply be picked again
+                            bars[rec["id"]].progress(1.0, text=f"❌ {rec.get('topic')} – transcription failed: {transcript_text.lstrip('❌ ')}")
+                            continue
+                        file_id = os.path.basename(path)
+                        os.makedirs("outputs", exist_ok=True)
+                        with open(f"outputs/{file_id}_transcript.txt", "w", encoding="utf-8") as f:
+                            f.write(transcript_text)
+                        index_meeting(file_id, title=rec.get("topic") or file_id, transcript=transcript_text,
+                                      transcript_path=f"outputs/{file_id}_transcript.txt")
+                        st.session_state.setdefault("zoom_meetings", {})[file_id] = {
+                            "audio_path": path,
+                            "file_id": file_id,
+                            "upload_file_name": rec.get("topic") or file_id,
+                            "transcript_text": transcript_text,
+                        }
+                        bars[rec["id"]].progress(1.0, text=f"✅ {rec.get('topic')} – transcribed")
+
+    #Downloaded Zoom meetings: pick one to summarize and analyze
+    if st.session_state.get("zoom_meetings"):
+        meetings = st.session_state["zoom_meetings"]
+        chosen = st.selectbox("Meeting to analyze", list(meetings), format_func=lambda key: meetings[key]["upload_file_name"])
+        if st.button("🔍 Analyze Meeting"):
+            #Only the transcript is taken over: without an audio_path the Transcribe button below stays hidden, as the
+            #recording is already transcribed
+            st.session_state.update({key: meetings[chosen][key] for key in ("file_id", "upload_file_name", "transcript_text")})
+            st.session_state.pop("audio_path", None)
+            from backend.pipeline import analyze_transcript
+            from backend.search_index import index_meeting
+            #When streaming, only the mood is computed here: the summary and suggestions stream in below, as for uploads
+            with st.spinner("🙂 Analyzing the meeting mood" if STREAM_OUTPUT else "📋 Generating Summary, Meeting Mood and Suggestions"):
+                analysis = analyze_transcript(meetings[chosen]["transcript_text"], ["sentiment"] if STREAM_OUTPUT else None)
+            store_analysis(analysis)
+            #Indexed from this run's own result (when streaming, the summary is indexed once it has streamed in below)
+            if analysis["results"].get("summary"):
+                index_meeting(chosen, summary=analysis["results"]["summary"])
+
+#Transcription using OpenAI Whisper | runs as a background job, so the session stays responsive and a page refresh doesn't lose the work
 if "audio_path" in st.session_state and os.path.exists(st.session_state["audio_path"]):
-    from backend.transcribe_whisper import transcribe_audio
     file_path = st.session_state.get("audio_path", None)
-    if st.button("📝 Transcribe"):
+    if st.button("📝 Analyze Transcript" if file_path.lower().endswith((".vtt", ".txt")) else "📝 Transcribe"):
         if not file_path or not os.path.exists(file_path):
             st.error("⚠️ Invalid file path. Please re-upload the file!")
             st.write("File path",file_path)
         else:
-            with st.spinner("Transcribing with Whisper..."):
-                try:
-                    transcript_text = transcribe_audio(file_path)
-                    st.success("📝 Transcription complete!")
-                    #st.text_area("Transcript", transcript_text, height=300)
-                    st.session_state["transcript_text"] = transcript_text
-                    
-                    #Save transcript to a text file
-                    transcript_file_path = f"outputs/{st.session_state['upload_file_name']}_transcript.txt"
-                    os.makedirs("outputs", exist_ok=True)
-                    with open(transcript_file_path, "w", encoding="utf-8") as f:
-                        f.write(transcript_text)
-                    
-                    #Sending the transcript text to GPT for summary and action items
-                    from backend.summarize_gpt import summarize_actions
-                    if "transcript_text" in st.session_state:
-                        with st.spinner("📋 Generating Summary and Action Items"):
-                            try:
-                                summary_output = summarize_actions(transcript_text)
-                                st.session_state["summary_output"] = summary_output
-                            except RuntimeError as e:   #Exception when GPT-4 summarization fails
-                                st.error(str(e))
-                except RuntimeError as e:   #Exception when transcibe by whisper fails
-                    st.error(str(e))
+            from backend.job_queue import get_job_queue
+            #Owner id for the per-user job limit, kept in the session rather than the URL so it can't be edited there.
+            #The limit is advisory: there is no login, so a new browser session simply gets a new id
+            owner = st.session_state.setdefault("job_owner", uuid.uuid4().hex)
+            st.session_state["job_id"] = get_job_queue().submit(
+                "analyze_recording",
+                {"audio_path": file_path, "file_id": st.session_state["file_id"], "file_name": st.session_state["upload_file_name"],
+                 "stages": ["sentiment"] if STREAM_OUTPUT else None},     #When streaming, the GPT stages run below in the page
+                owner=owner,
+            )
+            st.query_params["job"] = st.session_state["job_id"]     #Kept in the URL so a refresh picks the job up again
+
+#Background job status | polled on every rerun until the job is finished, then its results are loaded into the session
+job_running = False
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+if job_id and st.session_state.get("loaded_job") != job_id:
+    from backend.job_queue import get_job_queue, DONE, FAILED
+    job = get_job_queue().get(job_id)
+    if job is not None:
+        st.session_state.setdefault("job_owner", job["owner"])     #Restored with the job: after a refresh, new jobs count against the same owner
+    if job is None:
+        st.query_params.pop("job", None)
+    elif job["status"] == DONE:
+        st.session_state.update({
+            "audio_path": job["payload"]["audio_path"],
+            "file_id": job["payload"]["file_id"],
+            "upload_file_name": job["payload"].get("file_name", job["payload"]["file_id"]),
+            "transcript_text": job["result"]["transcript"],
+            "loaded_job": job_id,
+        })
+        store_analysis(job["result"]["analysis"])
+        st.success("📝 Transcription complete!")
+    elif job["status"] == FAILED:
+        st.session_state["loaded_job"] = job_id
+        st.error(f"❌ {job['error']}")
+    else:
+        job_running = True
+        st.info(f"⏳ {job['progress'] or job['status']}")
+
+def prefetch_stream(chunks, cancelled):
+    """
+    Consumes a text stream on a background thread, so its request runs while another stream is being rendered.
+    Args:
+        chunks (generator): Stream of text chunks (e.g. generate_suggestions_stream()).
+        cancelled (threading.Event): Set when nobody will read the rest (e.g. the rerun was interrupted). The thread then
+            closes the stream, which ends the request instead of paying for tokens that are never shown.
+    Returns:
+        iterator: Replays the chunks as they arrive, for st.write_stream. An error raised by the stream is raised again
+            by the iterator.
+    """
+    buffer = queue.Queue()
+    def pump():
+        try:
+            for chunk in chunks:
+                if cancelled.is_set():
+                    break
+                buffer.put(chunk)
+        except Exception as e:
+            buffer.put(e)   #Handed over to the reader, on the script thread
+        finally:
+            chunks.close()
+            buffer.put(None)    #End of stream
+    def replay():
+        for chunk in iter(buffer.get, None):
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    threading.Thread(target=pump, daemon=True).start()
+    return replay()
+
+#Summary and manager suggestions streamed from GPT token by token | both requests start at once, the suggestions are shown after the summary
+#The summary only needs the transcript. The suggestions also need the mood, so they are left out when the sentiment stage failed
+transcript_ready = "transcript_text" in st.session_state and not st.session_state["transcript_text"].startswith("❌")
+need_summary = transcript_ready and "summary_output" not in st.session_state
+need_suggestions = transcript_ready and "suggestions" not in st.session_state and "meeting_sentiment" in st.session_state
+if STREAM_OUTPUT and not job_running and (need_summary or need_suggestions):
+    from backend.summarize_gpt import summarize_actions_stream, generate_suggestions_stream
+    stream_metrics = st.session_state.setdefault("stream_metrics", {})
+    streams = {}
+    cancelled = threading.Event()
+    if need_suggestions:
+        stream_metrics["suggestions"] = {}
+        streams["suggestions"] = prefetch_stream(generate_suggestions_stream(
+            st.session_state["transcript_text"], st.session_state["meeting_sentiment"], stream_metrics["suggestions"]), cancelled)
+    if need_summary:
+        stream_metrics["summary"] = {}
+        streams["summary_output"] = summarize_actions_stream(st.session_state["transcript_text"], stream_metrics["summary"])
+
+    try:
+        live = st.empty()
+        with live.container():
+            for key, label in (("summary_output", "Summary & Action Items"), ("suggestions", "Suggestions")):
+                if key in streams:
+                    st.markdown(f"**{label}**")
+                    try:
+                        st.session_state[key] = st.write_stream(streams[key]).strip()   #Final text kept for the text areas below
+                    except Exception as e:  #Failed midway: the partial text is dropped, so it is neither shown nor indexed
+                        st.session_state[key] = f"❌ Something went wrong {e}"
+        live.empty()    #Replaced by the regular text areas further down
+    finally:
+        #A rerun triggered while streaming (a click, a new upload) stops this script here: end both requests
+        cancelled.set()
+        if "summary_output" in streams:
+            streams["summary_output"].close()
+    if "summary_output" in streams:
+        from backend.search_index import index_meeting
+        index_meeting(st.session_state["file_id"], summary=st.session_state["summary_output"])
 
 #Download transcript
 if "transcript_text" in st.session_state:
-    transcript_file_path = f"outputs/{st.session_state['upload_file_name']}_transcript.txt"
+    transcript_file_path = f"outputs/{st.session_state['file_id']}_transcript.txt"
     if os.path.exists(transcript_file_path):
         with open(transcript_file_path, "rb") as f:
             st.download_button(
@@ -264,19 +525,18 @@ if "transcript_text" in st.session_state:
 if "summary_output" in st.session_state:
     st.text_area("Summary & Action Items", st.session_state["summary_output"], height=300)
 
-#Sentiment Analysis of the Transcribed Text
-if "transcript_text" in st.session_state and "summary_output" in st.session_state:
-    from backend.sentiment_analysis import analyze_sentiment
-    if st.button("🙂🙁 Get Meeting Mood"):
-        with st.spinner("Analyzing meeting mood..."):
-            try:
-                sentiment_result = analyze_sentiment(st.session_state["transcript_text"])
-                st.success("✅ Sentiment Analysis Complete")
-                st.session_state["meeting_sentiment"] = sentiment_result[0]
-                st.markdown(f"**Meeting Mood:** {sentiment_result[0]}")
-            except RuntimeError as e:
-                st.error("❌ Something went wrong")
-                st.error(str(e))
+#Sentiment Analysis of the Transcribed Text | the whole transcript is judged in overlapping 512-token windows
+if "meeting_sentiment" in st.session_state:
+    st.markdown(f"**Meeting Mood:** {st.session_state['meeting_sentiment']}")
+    mood_emoji = {"Negative": "🙁", "Neutral": "😐", "Positive": "🙂"}
+    st.caption("Mood over time: " + " ".join(mood_emoji[w["sentiment"]] for w in st.session_state.get("sentiment_timeline", [])))
+    if "speaker_sentiment" in st.session_state:     #Transcripts with speakers and timestamps (.vtt)
+        speakers = st.session_state["speaker_sentiment"]
+        st.caption("Mood by speaker: " + " · ".join(
+            f"{name} {mood_emoji[s['sentiment']]}" for name, s in speakers["speakers"].items()))
+        if speakers["slices"]:
+            st.caption(f"Mood per {speakers['slices'][0]['end'] - speakers['slices'][0]['start']}s: "
+                       + " ".join(mood_emoji[s["sentiment"]] for s in speakers["slices"]))
 
 #Testing Snippet: Sentiment Analysis by uploading a transcript text file. You can also enable this as a feature
 # upload_transcribed_file = st.file_uploader("Upload your transcribed file", type=["txt"])
@@ -299,13 +559,34 @@ if "transcript_text" in st.session_state and "summary_output" in st.session_stat
 #                 st.error(str(e))
 
 #Suggestions for manager based on the meeting seniment detected
-if "transcript_text" in st.session_state and "meeting_sentiment" in st.session_state:
-    if st.button("Manager Suggestions"):
-        with st.spinner("Generating Suggestions..."):
-            try:
-                from backend.summarize_gpt import generate_suggestions
-                suggestions = generate_suggestions(st.session_state["transcript_text"], st.session_state["meeting_sentiment"])
-                st.text_area("Suggestions:", suggestions, height=300)
-            except RuntimeError as e:
-                st.error("❌ Something went wrong")
-                st.error(str(e))
\ No newline at end of file
+if "suggestions" in st.session_state:
+    st.text_area("Suggestions:", st.session_state["suggestions"], height=300)
+
+#Stages of the analysis that failed, and how long each one took
+for stage, error in st.session_state.get("analysis_errors", {}).items():
+    st.error(f"❌ {stage.capitalize()} failed: {error}")
+if "analysis_timings" in st.session_state:
+    timings = [f"{stage} {seconds:.1f}s" for stage, seconds in st.session_state["analysis_timings"].items()]
+    timings += [    #Streamed GPT calls: total generation time and time to first token
+        f"{stage} {m['total_seconds']:.1f}s (first token {m['time_to_first_token']:.1f}s)"
+        for stage, m in st.session_state.get("stream_metrics", {}).items() if "total_seconds" in m and "time_to_first_token" in m
+    ]
+    st.caption("⏱️ " + " · ".join(timings))
+
+#Rerun cost: set BRIEFLY_PROFILE_RERUN=1 to show how long this script run took and the process memory
+if os.getenv("BRIEFLY_PROFILE_RERUN") == "1":
+    from backend.model_registry import current_rss_mb
+    st.sidebar.caption(
+        f"⏱️ Rerun {1000 * (time.perf_counter() - _rerun_started):.0f} ms · RSS {current_rss_mb()} MB · "
+        f"torch loaded: {'torch' in sys.modules}"
+    )
+    from backend.instrumentation import export_json
+    with st.sidebar.expander("Stage metrics"):     #Totals of this server process, see backend/instrumentation.py
+        st.json(export_json()["durations"])
+        if "backend.sentiment_analysis" in sys.modules:     #Batching of the sentiment requests of all sessions
+            st.json(sys.modules["backend.sentiment_analysis"].get_scheduler().stats())
+
+#Check on the background job again in a couple of seconds
+if job_running:
+    time.sleep(2)
+    st.rerun()
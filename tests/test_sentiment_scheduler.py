@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend.sentiment_scheduler import MicroBatchScheduler
+
+# ─────────────────────────────────────────────────────────────────────────────
+# MicroBatchScheduler tests
+# - run_batch is a plain function here, so no model is loaded
+# - Run from the repo root: python -m pytest tests (or python -m unittest discover tests)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class MicroBatchSchedulerTest(unittest.TestCase):
+    def test_requests_are_coalesced_and_answered_in_order(self):
+        sizes = []
+        def run_batch(items):
+            sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        scheduler = MicroBatchScheduler(run_batch, max_batch=4, max_wait_ms=200)
+        self.assertEqual(scheduler.infer(list(range(10))), [item * 2 for item in range(10)])
+        self.assertLessEqual(max(sizes), 4)
+        self.assertLess(len(sizes), 10)     #Several requests shared a batch
+        stats = scheduler.stats()
+        self.assertEqual(stats["requests"], 10)
+        self.assertEqual(stats["batches"], len(sizes))
+
+    def test_full_queue_rejects_after_submit_timeout(self):
+        started, release = threading.Event(), threading.Event()
+        def run_batch(items):
+            started.set()
+            release.wait(5)
+            return items
+
+        scheduler = MicroBatchScheduler(run_batch, max_batch=1, max_wait_ms=0, max_queue=1, submit_timeout=0.05)
+        running = scheduler.submit("a")
+        self.assertTrue(started.wait(5))    #The worker holds "a", so the queue is empty again
+        queued = scheduler.submit("b")
+        with self.assertRaises(RuntimeError):
+            scheduler.submit("c")
+        self.assertEqual(scheduler.stats()["rejected"], 1)
+        release.set()
+        self.assertEqual((running.result(5), queued.result(5)), ("a", "b"))
+
+    def test_infer_cancels_queued_items_when_the_queue_fills(self):
+        started, release = threading.Event(), threading.Event()
+        seen = []
+        def run_batch(items):
+            started.set()
+            release.wait(5)
+            seen.extend(items)
+            return items
+
+        scheduler = MicroBatchScheduler(run_batch, max_batch=1, max_wait_ms=0, max_queue=1, submit_timeout=0.05)
+        blocker = scheduler.submit("blocker")
+        self.assertTrue(started.wait(5))
+        with self.assertRaises(RuntimeError):
+            scheduler.infer(["a", "b"])     #"a" is queued, "b" finds the queue full
+        release.set()
+        self.assertEqual(blocker.result(5), "blocker")
+        self.assertEqual(scheduler.infer(["c"], timeout=5), ["c"])
+        self.assertEqual(seen, ["blocker", "c"])    #"a" was cancelled, not computed
+
+    def test_batch_exception_reaches_every_caller(self):
+        def run_batch(items):
+            if "bad" in items:
+                raise ValueError("model failed")
+            return items
+
+        scheduler = MicroBatchScheduler(run_batch, max_batch=8, max_wait_ms=200)
+        futures = [scheduler.submit(item) for item in ("ok", "bad", "ok")]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(5)
+        self.assertEqual(scheduler.infer(["next"]), ["next"])   #The worker keeps serving
+
+    def test_short_result_fails_the_whole_batch(self):
+        scheduler = MicroBatchScheduler(lambda items: items[:-1], max_batch=8, max_wait_ms=200)
+        futures = [scheduler.submit(item) for item in range(3)]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(5)
+
+    def test_infer_gives_up_after_timeout(self):
+        release = threading.Event()
+        scheduler = MicroBatchScheduler(lambda items: release.wait(5) and items, max_batch=1, max_wait_ms=0)
+        started = time.perf_counter()
+        with self.assertRaises(RuntimeError):
+            scheduler.infer(["a", "b"], timeout=0.1)
+        self.assertLess(time.perf_counter() - started, 2)
+        release.set()
+        self.assertEqual(scheduler.infer(["c"], timeout=5), ["c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+try:
+    import torch
+    from tokenizers.pre_tokenizers import ByteLevel
+    from transformers import RobertaConfig, RobertaForSequenceClassification, RobertaTokenizer
+except ImportError:     #Needs the full requirements.txt install
+    torch = None
+
+# ─────────────────────────────────────────────────────────────────────────────
+# analyze_sentiment_windows() tests
+# - Run on a tiny randomly initialised RoBERTa with a byte-level vocabulary and no merges (one token per character),
+#   built in a temp dir, so nothing is downloaded and the windows are small enough to reason about
+# - Skipped when torch or transformers are not installed
+# ─────────────────────────────────────────────────────────────────────────────
+
+WINDOW_SIZE = 32
+
+
+def tiny_model():
+    vocab = {token: i for i, token in enumerate(["<s>", "<pad>", "</s>", "<unk>"])}
+    for char in sorted(ByteLevel.alphabet()):
+        vocab.setdefault(char, len(vocab))
+    vocab["<mask>"] = len(vocab)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with open(os.path.join(tmp_dir, "vocab.json"), "w") as f:
+            json.dump(vocab, f)
+        with open(os.path.join(tmp_dir, "merges.txt"), "w") as f:
+            f.write("#version: 0.2\n")
+        tokenizer = RobertaTokenizer(os.path.join(tmp_dir, "vocab.json"), os.path.join(tmp_dir, "merges.txt"))
+    config = RobertaConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+                           intermediate_size=32, max_position_embeddings=WINDOW_SIZE + 2, num_labels=3, pad_token_id=1)
+    torch.manual_seed(0)
+    return tokenizer, RobertaForSequenceClassification(config).eval()
+
+
+@unittest.skipIf(torch is None, "torch and transformers are not installed")
+class AnalyzeSentimentWindowsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from backend import model_registry, sentiment_analysis
+        cls.sentiment = sentiment_analysis
+        cls.tokenizer, model = tiny_model()
+        cls.models = mock.patch.dict(model_registry._models, {"fp32": (cls.tokenizer, model)})
+        cls.models.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.models.stop()
+
+    def analyze(self, text):
+        with mock.patch.object(self.sentiment, "_infer", wraps=self.sentiment._infer) as infer:
+            result = self.sentiment.analyze_sentiment_windows(text, window_size=WINDOW_SIZE, stride=8, batch_size=3,
+                                                              backend="fp32")
+        windows = [window for call in infer.call_args_list for window in call.args[0]]
+        return result, windows
+
+    def test_long_text_is_split_into_overlapping_windows(self):
+        text = " ".join(f"Item {i} is on track, the review went well." for i in range(6))
+        result, windows = self.analyze(text)
+
+        self.assertGreater(result["windows"], 1)
+        self.assertEqual(len(windows), result["windows"])
+        for window in windows:
+            self.assertLessEqual(len(window), WINDOW_SIZE)
+            self.assertEqual((window[0], window[-1]), (self.tokenizer.cls_token_id, self.tokenizer.sep_token_id))
+        timeline = result["timeline"]
+        self.assertEqual(timeline[0]["start_char"], 0)
+        self.assertEqual(timeline[-1]["end_char"], len(text))
+        for previous, current in zip(timeline, timeline[1:]):
+            self.assertLess(current["start_char"], previous["end_char"])    #Neighbouring windows share the stride
+        self.assertIn(result["sentiment"], ("Negative", "Neutral", "Positive"))
+
+    def test_short_and_empty_text_give_one_window(self):
+        for text in ("Looks good.", ""):
+            result, windows = self.analyze(text)
+            self.assertEqual(result["windows"], 1)
+            self.assertEqual(len(windows), 1)
+            self.assertEqual(windows[0][0], self.tokenizer.cls_token_id)
+
+
+if __name__ == "__main__":
+    unittest.main()